@@ -6,9 +6,11 @@ import (
 	"log"
 	"net/http"
 	"os"
+	"strconv"
 	"time"
 
 	"github.com/go-chi/chi/v5"
+	"github.com/go-chi/chi/v5/middleware"
 	"github.com/go-chi/cors"
 	"github.com/joho/godotenv"
 
@@ -67,6 +69,25 @@ func main() {
 		AllowCredentials: true,
 	}))
 
+	// Optional response compression, for running the API without Caddy.
+	// In the deployed setup Caddy already encodes responses (gzip/zstd), so
+	// compressing here too would only spend API CPU on every position poll.
+	if v := os.Getenv("API_GZIP_LEVEL"); v != "" {
+		if n, err := strconv.Atoi(v); err == nil && n >= 1 && n <= 9 {
+			r.Use(middleware.Compress(n,
+				"application/json",
+				"application/geo+json",
+				"text/html",
+				"text/css",
+				"text/javascript",
+				"application/javascript",
+				"image/svg+xml",
+			))
+		} else {
+			log.Printf("Ignoring invalid API_GZIP_LEVEL %q (expected 1-9)", v)
+		}
+	}
+
 	// Health check endpoint with database connectivity test
 	r.Get("/health", func(w http.ResponseWriter, r *http.Request) {
 		ctx, cancel := context.WithTimeout(context.Background(), 2*time.Second)
@@ -55,6 +55,24 @@ func (s *SQLiteDB) GetDB() *sql.DB {
 	return s.db
 }
 
+// sqlQueryer is satisfied by both *sql.DB and *sql.Tx, so read helpers can run
+// either standalone or inside a snapshot transaction
+type sqlQueryer interface {
+	QueryContext(ctx context.Context, query string, args ...interface{}) (*sql.Rows, error)
+	QueryRowContext(ctx context.Context, query string, args ...interface{}) *sql.Row
+}
+
+// beginReadSnapshot opens a transaction used only for reads. In WAL mode every
+// query inside it sees the same committed state, so multi-query reads can't
+// straddle a poller write and only take one read lock between them.
+func beginReadSnapshot(ctx context.Context, db *sql.DB) (*sql.Tx, error) {
+	tx, err := db.BeginTx(ctx, nil)
+	if err != nil {
+		return nil, fmt.Errorf("failed to begin read transaction: %w", err)
+	}
+	return tx, nil
+}
+
 // SQLiteTrainRepository handles database operations for Rodalies trains using SQLite
 type SQLiteTrainRepository struct {
 	db *sql.DB
@@ -382,6 +400,12 @@ func (r *SQLiteTrainRepository) GetAllTrainPositions(ctx context.Context) ([]mod
 func (r *SQLiteTrainRepository) GetTrainPositionsWithHistory(
 	ctx context.Context,
 ) ([]models.TrainPosition, []models.TrainPosition, time.Time, *time.Time, error) {
+	tx, err := beginReadSnapshot(ctx, r.db)
+	if err != nil {
+		return nil, nil, time.Time{}, nil, err
+	}
+	defer tx.Rollback()
+
 	// Get the current snapshot ID
 	const currentSnapshotQuery = `
 		SELECT c.snapshot_id, s.polled_at_utc
@@ -394,7 +418,7 @@ func (r *SQLiteTrainRepository) GetTrainPositionsWithHistory(
 	var currentSnapshotID string
 	var currentPolledAtStr string
 
-	if err := r.db.QueryRowContext(ctx, currentSnapshotQuery).Scan(&currentSnapshotID, &currentPolledAtStr); err != nil {
+	if err := tx.QueryRowContext(ctx, currentSnapshotQuery).Scan(&currentSnapshotID, &currentPolledAtStr); err != nil {
 		if errors.Is(err, sql.ErrNoRows) {
 			return []models.TrainPosition{}, nil, time.Time{}, nil, nil
 		}
@@ -404,7 +428,7 @@ func (r *SQLiteTrainRepository) GetTrainPositionsWithHistory(
 	currentPolledAt, _ := time.Parse(time.RFC3339, currentPolledAtStr)
 
 	// Fetch current positions
-	currentPositions, err := r.fetchPositionsForSnapshot(ctx, "rt_rodalies_vehicle_current", currentSnapshotID)
+	currentPositions, err := r.fetchPositionsForSnapshot(ctx, tx, "rt_rodalies_vehicle_current", currentSnapshotID)
 	if err != nil {
 		return nil, nil, time.Time{}, nil, fmt.Errorf("failed to fetch current train positions: %w", err)
 	}
@@ -426,7 +450,7 @@ func (r *SQLiteTrainRepository) GetTrainPositionsWithHistory(
 	var previousSnapshotID string
 	var previousPolledAtStr string
 
-	err = r.db.QueryRowContext(ctx, previousSnapshotQuery, currentPolledAtStr).Scan(&previousSnapshotID, &previousPolledAtStr)
+	err = tx.QueryRowContext(ctx, previousSnapshotQuery, currentPolledAtStr).Scan(&previousSnapshotID, &previousPolledAtStr)
 	if err != nil {
 		if !errors.Is(err, sql.ErrNoRows) {
 			return nil, nil, time.Time{}, nil, fmt.Errorf("failed to fetch previous snapshot: %w", err)
@@ -435,7 +459,7 @@ func (r *SQLiteTrainRepository) GetTrainPositionsWithHistory(
 		previousPolledAt, _ := time.Parse(time.RFC3339, previousPolledAtStr)
 		previousPolledAtPtr = &previousPolledAt
 
-		previousPositions, err = r.fetchPositionsForSnapshot(ctx, "rt_rodalies_vehicle_history", previousSnapshotID)
+		previousPositions, err = r.fetchPositionsForSnapshot(ctx, tx, "rt_rodalies_vehicle_history", previousSnapshotID)
 		if err != nil {
 			return nil, nil, time.Time{}, nil, fmt.Errorf("failed to fetch previous train positions: %w", err)
 		}
@@ -446,6 +470,7 @@ func (r *SQLiteTrainRepository) GetTrainPositionsWithHistory(
 
 func (r *SQLiteTrainRepository) fetchPositionsForSnapshot(
 	ctx context.Context,
+	q sqlQueryer,
 	table string,
 	snapshotID string,
 ) ([]models.TrainPosition, error) {
@@ -463,7 +488,7 @@ func (r *SQLiteTrainRepository) fetchPositionsForSnapshot(
 		ORDER BY vehicle_key
 	`, table)
 
-	rows, err := r.db.QueryContext(ctx, query, snapshotID)
+	rows, err := q.QueryContext(ctx, query, snapshotID)
 	if err != nil {
 		return nil, fmt.Errorf("failed to query train positions: %w", err)
 	}
@@ -643,6 +668,12 @@ func (r *SQLiteMetroRepository) GetMetroPositionsWithHistory(
 	ctx context.Context,
 	lineCode string,
 ) ([]models.MetroPosition, []models.MetroPosition, time.Time, *time.Time, error) {
+	tx, err := beginReadSnapshot(ctx, r.db)
+	if err != nil {
+		return nil, nil, time.Time{}, nil, err
+	}
+	defer tx.Rollback()
+
 	// Get the most recent polled_at_utc directly from metro current table
 	// (don't join rt_snapshots as old snapshots may be cleaned up)
 	const currentPolledAtQuery = `
@@ -654,7 +685,7 @@ func (r *SQLiteMetroRepository) GetMetroPositionsWithHistory(
 
 	var currentPolledAtStr string
 
-	if err := r.db.QueryRowContext(ctx, currentPolledAtQuery).Scan(&currentPolledAtStr); err != nil {
+	if err := tx.QueryRowContext(ctx, currentPolledAtQuery).Scan(&currentPolledAtStr); err != nil {
 		if errors.Is(err, sql.ErrNoRows) {
 			return []models.MetroPosition{}, nil, time.Time{}, nil, nil
 		}
@@ -664,7 +695,7 @@ func (r *SQLiteMetroRepository) GetMetroPositionsWithHistory(
 	currentPolledAt, _ := time.Parse(time.RFC3339, currentPolledAtStr)
 
 	// Fetch all current positions (no snapshot filtering needed - current table only has latest)
-	currentPositions, err := r.fetchAllMetroPositions(ctx, lineCode)
+	currentPositions, err := r.fetchAllMetroPositions(ctx, tx, lineCode)
 	if err != nil {
 		return nil, nil, time.Time{}, nil, fmt.Errorf("failed to fetch current metro positions: %w", err)
 	}
@@ -684,7 +715,7 @@ func (r *SQLiteMetroRepository) GetMetroPositionsWithHistory(
 
 	var previousPolledAtStr string
 
-	err = r.db.QueryRowContext(ctx, previousPolledAtQuery, currentPolledAtStr).Scan(&previousPolledAtStr)
+	err = tx.QueryRowContext(ctx, previousPolledAtQuery, currentPolledAtStr).Scan(&previousPolledAtStr)
 	if err != nil {
 		if !errors.Is(err, sql.ErrNoRows) {
 			return nil, nil, time.Time{}, nil, fmt.Errorf("failed to fetch previous polled_at: %w", err)
@@ -693,7 +724,7 @@ func (r *SQLiteMetroRepository) GetMetroPositionsWithHistory(
 		previousPolledAt, _ := time.Parse(time.RFC3339, previousPolledAtStr)
 		previousPolledAtPtr = &previousPolledAt
 
-		previousPositions, err = r.fetchMetroHistoryPositions(ctx, previousPolledAtStr, lineCode)
+		previousPositions, err = r.fetchMetroHistoryPositions(ctx, tx, previousPolledAtStr, lineCode)
 		if err != nil {
 			return nil, nil, time.Time{}, nil, fmt.Errorf("failed to fetch previous metro positions: %w", err)
 		}
@@ -811,6 +842,7 @@ func (r *SQLiteMetroRepository) fetchMetroPositionsForSnapshot(
 // fetchAllMetroPositions fetches all current metro positions (no snapshot filter)
 func (r *SQLiteMetroRepository) fetchAllMetroPositions(
 	ctx context.Context,
+	q sqlQueryer,
 	lineCode string,
 ) ([]models.MetroPosition, error) {
 	var query string
@@ -849,7 +881,7 @@ func (r *SQLiteMetroRepository) fetchAllMetroPositions(
 		query = baseQuery + " ORDER BY line_code, direction_id, vehicle_key"
 	}
 
-	rows, err := r.db.QueryContext(ctx, query, args...)
+	rows, err := q.QueryContext(ctx, query, args...)
 	if err != nil {
 		return nil, fmt.Errorf("failed to query metro positions: %w", err)
 	}
@@ -861,6 +893,7 @@ func (r *SQLiteMetroRepository) fetchAllMetroPositions(
 // fetchMetroHistoryPositions fetches metro positions from history at a specific polled_at_utc
 func (r *SQLiteMetroRepository) fetchMetroHistoryPositions(
 	ctx context.Context,
+	q sqlQueryer,
 	polledAtUTC string,
 	lineCode string,
 ) ([]models.MetroPosition, error) {
@@ -902,7 +935,7 @@ func (r *SQLiteMetroRepository) fetchMetroHistoryPositions(
 		args = []interface{}{polledAtUTC}
 	}
 
-	rows, err := r.db.QueryContext(ctx, query, args...)
+	rows, err := q.QueryContext(ctx, query, args...)
 	if err != nil {
 		return nil, fmt.Errorf("failed to query metro history positions: %w", err)
 	}
@@ -1082,14 +1115,17 @@ func (r *SQLiteScheduleRepository) GetSchedulePositionsByNetwork(ctx context.Con
 	var allPositions []models.SchedulePosition
 
 	for rows.Next() {
-		var network, positionsJSON string
+		// Scan the JSON as RawBytes so the driver's buffer is decoded in place
+		// rather than copied into a string and then back into a []byte
+		var network string
+		var positionsJSON sql.RawBytes
 		if err := rows.Scan(&network, &positionsJSON); err != nil {
 			return nil, time.Time{}, fmt.Errorf("failed to scan pre-calc row: %w", err)
 		}
 
 		// Parse JSON positions
 		var preCalcPositions []preCalcPosition
-		if err := json.Unmarshal([]byte(positionsJSON), &preCalcPositions); err != nil {
+		if err := json.Unmarshal(positionsJSON, &preCalcPositions); err != nil {
 			return nil, time.Time{}, fmt.Errorf("failed to parse positions JSON: %w", err)
 		}
 
@@ -43,6 +43,12 @@ type TripStopTime struct {
 	StopLon          float64
 }
 
+// tripKey identifies a trip within a network
+type tripKey struct {
+	Network string
+	TripID  string
+}
+
 // RouteInfo contains route metadata
 type RouteInfo struct {
 	RouteShortName string
@@ -82,17 +88,18 @@ func main() {
 		log.Fatalf("Failed to get route info: %v", err)
 	}
 
+	// Load stop times for every active trip up front instead of one query per trip
+	tripStopTimes, err := getStopTimesForDate(ctx, database, dateStr)
+	if err != nil {
+		log.Fatalf("Failed to get stop times: %v", err)
+	}
+
 	// Calculate positions for trips in progress
 	positions := []db.SchedulePosition{}
 	inProgressCount := 0
 
 	for _, trip := range activeTrips {
-		stopTimes, err := getTripStopTimes(ctx, database, trip.Network, trip.TripID)
-		if err != nil {
-			log.Printf("Warning: failed to get stop times for trip %s: %v", trip.TripID, err)
-			continue
-		}
-
+		stopTimes := tripStopTimes[tripKey{Network: trip.Network, TripID: trip.TripID}]
 		if len(stopTimes) < 2 {
 			continue
 		}
@@ -161,33 +168,42 @@ func getActiveTrips(ctx context.Context, database *db.DB, dateStr string) ([]Act
 	return trips, rows.Err()
 }
 
-func getTripStopTimes(ctx context.Context, database *db.DB, network, tripID string) ([]TripStopTime, error) {
+// getStopTimesForDate returns the stop times of every trip active on dateStr,
+// keyed by network and trip and ordered by sequence
+func getStopTimesForDate(ctx context.Context, database *db.DB, dateStr string) (map[tripKey][]TripStopTime, error) {
 	query := `
-		SELECT st.stop_id, st.stop_sequence, st.arrival_seconds, st.departure_seconds,
+		WITH active AS (
+			SELECT DISTINCT t.network, t.trip_id
+			FROM dim_trips t
+			JOIN dim_calendar_dates cd ON cd.service_id = t.service_id AND cd.network = t.network
+			WHERE cd.date = ? AND cd.exception_type = 1
+		)
+		SELECT st.network, st.trip_id, st.stop_id, st.stop_sequence, st.arrival_seconds, st.departure_seconds,
 		       s.stop_name, s.stop_lat, s.stop_lon
-		FROM dim_stop_times st
+		FROM active a
+		JOIN dim_stop_times st ON st.trip_id = a.trip_id AND st.network = a.network
 		JOIN dim_stops s ON s.stop_id = st.stop_id
-		WHERE st.trip_id = ? AND st.network = ?
-		ORDER BY st.stop_sequence
+		ORDER BY st.network, st.trip_id, st.stop_sequence
 	`
 
-	rows, err := database.Conn().QueryContext(ctx, query, tripID, network)
+	rows, err := database.Conn().QueryContext(ctx, query, dateStr)
 	if err != nil {
 		return nil, err
 	}
 	defer rows.Close()
 
-	var stops []TripStopTime
+	stopTimes := make(map[tripKey][]TripStopTime)
 	for rows.Next() {
+		var key tripKey
 		var st TripStopTime
-		if err := rows.Scan(&st.StopID, &st.StopSequence, &st.ArrivalSeconds, &st.DepartureSeconds,
+		if err := rows.Scan(&key.Network, &key.TripID, &st.StopID, &st.StopSequence, &st.ArrivalSeconds, &st.DepartureSeconds,
 			&st.StopName, &st.StopLat, &st.StopLon); err != nil {
 			return nil, err
 		}
-		stops = append(stops, st)
+		stopTimes[key] = append(stopTimes[key], st)
 	}
 
-	return stops, rows.Err()
+	return stopTimes, rows.Err()
 }
 
 func getRouteInfo(ctx context.Context, database *db.DB) (map[string]RouteInfo, error) {
@@ -2,7 +2,6 @@ package main
 
 import (
 	"archive/zip"
-	"encoding/csv"
 	"encoding/json"
 	"flag"
 	"fmt"
@@ -14,6 +13,8 @@ import (
 	"strconv"
 	"strings"
 	"time"
+
+	"github.com/mini-rodalies-3d/poller/internal/static/gtfs"
 )
 
 // StopTime represents a scheduled stop
@@ -107,44 +108,69 @@ func processGTFS(zipPath, network, outputDir string, days int) error {
 	stopTimes := make(map[string][]StopTime) // tripId -> []StopTime
 	calendarDates := make(map[string][]string) // date -> []serviceId
 
+	files := make(map[string]*zip.File)
 	for _, f := range r.File {
-		switch f.Name {
-		case "routes.txt":
-			if err := parseRoutes(f, routes); err != nil {
-				return fmt.Errorf("routes.txt: %w", err)
-			}
-		case "trips.txt":
-			if err := parseTrips(f, trips, routes); err != nil {
-				return fmt.Errorf("trips.txt: %w", err)
-			}
-		case "stop_times.txt":
-			if err := parseStopTimes(f, stopTimes); err != nil {
-				return fmt.Errorf("stop_times.txt: %w", err)
-			}
-		case "calendar_dates.txt":
-			if err := parseCalendarDates(f, calendarDates); err != nil {
-				return fmt.Errorf("calendar_dates.txt: %w", err)
-			}
+		files[f.Name] = f
+	}
+
+	// stop_times.txt dominates the archive; inflate and parse it in the
+	// background while the small files are read. Each member is decompressed
+	// exactly once, and routes are parsed before trips, which need them to
+	// resolve short names regardless of the order of entries in the zip.
+	var stopTimesErr error
+	stopTimesDone := make(chan struct{})
+	go func() {
+		defer close(stopTimesDone)
+		if f, ok := files["stop_times.txt"]; ok {
+			stopTimesErr = parseStopTimes(f, stopTimes)
 		}
+	}()
+
+	if f, ok := files["routes.txt"]; ok {
+		if err := parseRoutes(f, routes); err != nil {
+			<-stopTimesDone
+			return fmt.Errorf("routes.txt: %w", err)
+		}
+	}
+	if f, ok := files["trips.txt"]; ok {
+		if err := parseTrips(f, trips, routes); err != nil {
+			<-stopTimesDone
+			return fmt.Errorf("trips.txt: %w", err)
+		}
+	}
+	if f, ok := files["calendar_dates.txt"]; ok {
+		if err := parseCalendarDates(f, calendarDates); err != nil {
+			<-stopTimesDone
+			return fmt.Errorf("calendar_dates.txt: %w", err)
+		}
+	}
+
+	<-stopTimesDone
+	if stopTimesErr != nil {
+		return fmt.Errorf("stop_times.txt: %w", stopTimesErr)
 	}
 
 	log.Printf("  Parsed: %d routes, %d trips, %d dates with service",
 		len(routes), len(trips), len(calendarDates))
 
-	// Attach stop_times to trips
+	// Attach stop_times to trips and build the service -> trips mapping in
+	// the same pass; only trips with stop times are ever exported
+	serviceTrips := make(map[string][]*Trip)
 	for tripID, stops := range stopTimes {
-		if trip, ok := trips[tripID]; ok {
-			sort.Slice(stops, func(i, j int) bool {
-				return stops[i].StopSequence < stops[j].StopSequence
-			})
-			trip.Stops = stops
+		trip, ok := trips[tripID]
+		if !ok {
+			continue
 		}
-	}
-
-	// Build service -> trips mapping
-	serviceTrips := make(map[string][]*Trip)
-	for _, trip := range trips {
-		if trip.ServiceID != "" && len(trip.Stops) > 0 {
+		// Feeds list a trip's stop_times in sequence order, so this is
+		// usually a linear check with nothing to sort
+		less := func(i, j int) bool {
+			return stops[i].StopSequence < stops[j].StopSequence
+		}
+		if !sort.SliceIsSorted(stops, less) {
+			sort.Slice(stops, less)
+		}
+		trip.Stops = stops
+		if trip.ServiceID != "" {
 			serviceTrips[trip.ServiceID] = append(serviceTrips[trip.ServiceID], trip)
 		}
 	}
@@ -241,13 +267,15 @@ func parseRoutes(f *zip.File, routes map[string]string) error {
 	}
 	defer rc.Close()
 
-	reader := csv.NewReader(rc)
+	reader := gtfs.NewCSVReader(rc)
 	headers, err := reader.Read()
 	if err != nil {
 		return err
 	}
 
 	idx := makeIndex(headers)
+	iRouteID := gtfs.Column(idx, "route_id")
+	iShortName := gtfs.Column(idx, "route_short_name")
 
 	for {
 		record, err := reader.Read()
@@ -258,8 +286,8 @@ func parseRoutes(f *zip.File, routes map[string]string) error {
 			continue
 		}
 
-		routeID := safeGet(record, idx["route_id"])
-		shortName := safeGet(record, idx["route_short_name"])
+		routeID := safeGet(record, iRouteID)
+		shortName := safeGet(record, iShortName)
 		if routeID != "" {
 			routes[routeID] = shortName
 		}
@@ -275,13 +303,19 @@ func parseTrips(f *zip.File, trips map[string]*Trip, routes map[string]string) e
 	}
 	defer rc.Close()
 
-	reader := csv.NewReader(rc)
+	reader := gtfs.NewCSVReader(rc)
 	headers, err := reader.Read()
 	if err != nil {
 		return err
 	}
 
 	idx := makeIndex(headers)
+	iTripID := gtfs.Column(idx, "trip_id")
+	iRouteID := gtfs.Column(idx, "route_id")
+	iDirection := gtfs.Column(idx, "direction_id")
+	iHeadsign := gtfs.Column(idx, "trip_headsign")
+	iServiceID := gtfs.Column(idx, "service_id")
+	pool := make(gtfs.StringPool)
 
 	for {
 		record, err := reader.Read()
@@ -292,17 +326,17 @@ func parseTrips(f *zip.File, trips map[string]*Trip, routes map[string]string) e
 			continue
 		}
 
-		tripID := safeGet(record, idx["trip_id"])
+		tripID := pool.Intern(safeGet(record, iTripID))
 		if tripID == "" {
 			continue
 		}
 
 		direction := 0
-		if d := safeGet(record, idx["direction_id"]); d != "" {
+		if d := safeGet(record, iDirection); d != "" {
 			direction, _ = strconv.Atoi(d)
 		}
 
-		routeID := safeGet(record, idx["route_id"])
+		routeID := pool.Intern(safeGet(record, iRouteID))
 		// Use route short name if available
 		if shortName, ok := routes[routeID]; ok && shortName != "" {
 			routeID = shortName
@@ -312,8 +346,8 @@ func parseTrips(f *zip.File, trips map[string]*Trip, routes map[string]string) e
 			TripID:      tripID,
 			RouteID:     routeID,
 			DirectionID: direction,
-			Headsign:    safeGet(record, idx["trip_headsign"]),
-			ServiceID:   safeGet(record, idx["service_id"]),
+			Headsign:    pool.Intern(safeGet(record, iHeadsign)),
+			ServiceID:   pool.Intern(safeGet(record, iServiceID)),
 		}
 	}
 
@@ -327,13 +361,19 @@ func parseStopTimes(f *zip.File, stopTimes map[string][]StopTime) error {
 	}
 	defer rc.Close()
 
-	reader := csv.NewReader(rc)
+	reader := gtfs.NewCSVReader(rc)
 	headers, err := reader.Read()
 	if err != nil {
 		return err
 	}
 
 	idx := makeIndex(headers)
+	iTripID := gtfs.Column(idx, "trip_id")
+	iStopID := gtfs.Column(idx, "stop_id")
+	iSequence := gtfs.Column(idx, "stop_sequence")
+	iArrival := gtfs.Column(idx, "arrival_time")
+	iDeparture := gtfs.Column(idx, "departure_time")
+	pool := make(gtfs.StringPool)
 
 	for {
 		record, err := reader.Read()
@@ -344,21 +384,21 @@ func parseStopTimes(f *zip.File, stopTimes map[string][]StopTime) error {
 			continue
 		}
 
-		tripID := safeGet(record, idx["trip_id"])
+		tripID := pool.Intern(safeGet(record, iTripID))
 		if tripID == "" {
 			continue
 		}
 
 		seq := 0
-		if s := safeGet(record, idx["stop_sequence"]); s != "" {
+		if s := safeGet(record, iSequence); s != "" {
 			seq, _ = strconv.Atoi(s)
 		}
 
 		st := StopTime{
-			StopID:           safeGet(record, idx["stop_id"]),
+			StopID:           pool.Intern(safeGet(record, iStopID)),
 			StopSequence:     seq,
-			ArrivalSeconds:   parseTimeToSeconds(safeGet(record, idx["arrival_time"])),
-			DepartureSeconds: parseTimeToSeconds(safeGet(record, idx["departure_time"])),
+			ArrivalSeconds:   parseTimeToSeconds(safeGet(record, iArrival)),
+			DepartureSeconds: parseTimeToSeconds(safeGet(record, iDeparture)),
 		}
 
 		stopTimes[tripID] = append(stopTimes[tripID], st)
@@ -374,13 +414,16 @@ func parseCalendarDates(f *zip.File, calendarDates map[string][]string) error {
 	}
 	defer rc.Close()
 
-	reader := csv.NewReader(rc)
+	reader := gtfs.NewCSVReader(rc)
 	headers, err := reader.Read()
 	if err != nil {
 		return err
 	}
 
 	idx := makeIndex(headers)
+	iDate := gtfs.Column(idx, "date")
+	iServiceID := gtfs.Column(idx, "service_id")
+	iExceptionType := gtfs.Column(idx, "exception_type")
 
 	for {
 		record, err := reader.Read()
@@ -392,14 +435,14 @@ func parseCalendarDates(f *zip.File, calendarDates map[string][]string) error {
 		}
 
 		exType := 1
-		if e := safeGet(record, idx["exception_type"]); e != "" {
+		if e := safeGet(record, iExceptionType); e != "" {
 			exType, _ = strconv.Atoi(e)
 		}
 
 		// Only include added services (exception_type = 1)
 		if exType == 1 {
-			date := safeGet(record, idx["date"])
-			serviceID := safeGet(record, idx["service_id"])
+			date := safeGet(record, iDate)
+			serviceID := safeGet(record, iServiceID)
 			if date != "" && serviceID != "" {
 				calendarDates[date] = append(calendarDates[date], serviceID)
 			}
@@ -409,20 +452,22 @@ func parseCalendarDates(f *zip.File, calendarDates map[string][]string) error {
 	return nil
 }
 
+// exportSchedule encodes the schedule in memory and writes it with a single
+// os.WriteFile so close errors (e.g. a full disk) are not lost
 func exportSchedule(schedule *DaySchedule, path string) error {
-	f, err := os.Create(path)
+	data, err := json.Marshal(schedule)
 	if err != nil {
 		return err
 	}
-	defer f.Close()
-
-	encoder := json.NewEncoder(f)
-	return encoder.Encode(schedule)
+	return os.WriteFile(path, append(data, '\n'), 0644)
 }
 
 func makeIndex(headers []string) map[string]int {
 	idx := make(map[string]int)
 	for i, h := range headers {
+		if i == 0 {
+			h = strings.TrimPrefix(h, "\ufeff") // UTF-8 BOM written by some exporters
+		}
 		idx[strings.TrimSpace(strings.ToLower(h))] = i
 	}
 	return idx
@@ -436,18 +481,23 @@ func safeGet(record []string, idx int) string {
 }
 
 func parseTimeToSeconds(timeStr string) int {
-	if timeStr == "" {
-		return 0
+	// Walk "HH:MM[:SS]" in place instead of strings.Split; this runs twice
+	// per stop_times row. Hours may exceed 24 for after-midnight service.
+	var parts [3]int
+	n := 0
+	start := 0
+	for i := 0; i <= len(timeStr); i++ {
+		if i < len(timeStr) && timeStr[i] != ':' {
+			continue
+		}
+		if n < len(parts) {
+			parts[n], _ = strconv.Atoi(timeStr[start:i])
+		}
+		n++
+		start = i + 1
 	}
-	parts := strings.Split(timeStr, ":")
-	if len(parts) < 2 {
+	if n < 2 {
 		return 0
 	}
-	hours, _ := strconv.Atoi(parts[0])
-	minutes, _ := strconv.Atoi(parts[1])
-	seconds := 0
-	if len(parts) >= 3 {
-		seconds, _ = strconv.Atoi(parts[2])
-	}
-	return hours*3600 + minutes*60 + seconds
+	return parts[0]*3600 + parts[1]*60 + parts[2]
 }
@@ -5,6 +5,7 @@ import (
 	"log"
 	"os"
 	"os/signal"
+	"sync"
 	"sync/atomic"
 	"syscall"
 	"time"
@@ -21,6 +22,14 @@ import (
 // cleanupRunning tracks async cleanup to prevent overlapping runs using atomic CAS
 var cleanupRunning atomic.Bool
 
+// cleanupInterval is the minimum time between retention cleanups. Retention
+// is measured in hours, so pruning on every poll only re-scans the history
+// indexes to delete a poll's worth of rows.
+const cleanupInterval = 10 * time.Minute
+
+// lastCleanup is the UnixNano time the last cleanup started
+var lastCleanup atomic.Int64
+
 func main() {
 	log.Println("Starting Go Poller Service...")
 
@@ -79,9 +88,16 @@ func main() {
 	ctx, cancel := context.WithCancel(context.Background())
 	defer cancel()
 
+	// Baselines and health statuses are derived from the counts each poll
+	// writes. They are computed on their own goroutine so the next poll's
+	// fetches are not held up behind these writes; requests made while one is
+	// already pending coalesce, since the learner reads the latest counts.
+	metricsRequests := make(chan struct{}, 1)
+	go runMetricsLoop(ctx, baselineLearner, metricsRequests)
+
 	// Initial poll immediately
 	log.Println("Running initial poll...")
-	pollOnce(ctx, rodaliesPoller, metroPoller, schedulePoller, database, cfg, baselineLearner)
+	pollOnce(ctx, rodaliesPoller, metroPoller, schedulePoller, database, cfg, metricsRequests)
 
 	// Real-time polling goroutine
 	go func() {
@@ -91,7 +107,7 @@ func main() {
 		for {
 			select {
 			case <-ticker.C:
-				pollOnce(ctx, rodaliesPoller, metroPoller, schedulePoller, database, cfg, baselineLearner)
+				pollOnce(ctx, rodaliesPoller, metroPoller, schedulePoller, database, cfg, metricsRequests)
 			case <-ctx.Done():
 				log.Println("Polling loop stopped")
 				return
@@ -136,38 +152,75 @@ func main() {
 	log.Println("Goodbye!")
 }
 
-func pollOnce(ctx context.Context, rodaliesPoller *rodalies.Poller, metroPoller *metro.Poller, schedulePoller *schedule.Poller, database *db.DB, cfg *config.Config, baselineLearner *metrics.BaselineLearner) {
+func pollOnce(ctx context.Context, rodaliesPoller *rodalies.Poller, metroPoller *metro.Poller, schedulePoller *schedule.Poller, database *db.DB, cfg *config.Config, metricsRequests chan<- struct{}) {
+	// The three networks fetch from independent upstreams and write to their
+	// own tables, so poll them concurrently. Database writes stay serialized
+	// by the DB write lock; only the network round-trips overlap.
+	var wg sync.WaitGroup
+
 	// Poll Rodalies
-	if err := rodaliesPoller.Poll(ctx); err != nil {
-		log.Printf("Rodalies poll error: %v", err)
-	}
+	wg.Add(1)
+	go func() {
+		defer wg.Done()
+		if err := rodaliesPoller.Poll(ctx); err != nil {
+			log.Printf("Rodalies poll error: %v", err)
+		}
+	}()
 
 	// Poll Metro
-	if err := metroPoller.Poll(ctx); err != nil {
-		log.Printf("Metro poll error: %v", err)
-	}
+	wg.Add(1)
+	go func() {
+		defer wg.Done()
+		if err := metroPoller.Poll(ctx); err != nil {
+			log.Printf("Metro poll error: %v", err)
+		}
+	}()
 
 	// Poll Schedule-based (TRAM, FGC, Bus)
 	if schedulePoller != nil {
-		if err := schedulePoller.Poll(ctx); err != nil {
-			log.Printf("Schedule poll error: %v", err)
-		}
+		wg.Add(1)
+		go func() {
+			defer wg.Done()
+			if err := schedulePoller.Poll(ctx); err != nil {
+				log.Printf("Schedule poll error: %v", err)
+			}
+		}()
 	}
 
-	// Update baselines with current vehicle counts (gradual learning)
-	if err := baselineLearner.UpdateBaselines(ctx); err != nil {
-		log.Printf("Baseline update error: %v", err)
-	}
+	// Baselines and health read the counts written above
+	wg.Wait()
 
-	// Record health status for uptime tracking
-	if err := baselineLearner.RecordHealthStatuses(ctx); err != nil {
-		log.Printf("Health status recording error: %v", err)
+	select {
+	case metricsRequests <- struct{}{}:
+	default: // an update is already pending and will see these counts
 	}
 
-	// Async cleanup - don't block polling, skip if already running
+	// Async cleanup - don't block polling, skip if already running or if
+	// one ran recently
 	go runCleanupAsync(database, cfg.RetentionDuration)
 }
 
+// runMetricsLoop updates baselines and health statuses once per request
+// until ctx is cancelled
+func runMetricsLoop(ctx context.Context, baselineLearner *metrics.BaselineLearner, requests <-chan struct{}) {
+	for {
+		select {
+		case <-requests:
+			// Update baselines with current vehicle counts (gradual learning)
+			if err := baselineLearner.UpdateBaselines(ctx); err != nil {
+				log.Printf("Baseline update error: %v", err)
+			}
+
+			// Record health status for uptime tracking
+			if err := baselineLearner.RecordHealthStatuses(ctx); err != nil {
+				log.Printf("Health status recording error: %v", err)
+			}
+		case <-ctx.Done():
+			return
+		}
+	}
+}
+
 // runCleanupAsync runs cleanup in background, skipping if already running.
 // Uses atomic CompareAndSwap to avoid TOCTOU race conditions.
 func runCleanupAsync(database *db.DB, retention time.Duration) {
@@ -177,7 +230,16 @@ func runCleanupAsync(database *db.DB, retention time.Duration) {
 	}
 	defer cleanupRunning.Store(false)
 
+	now := time.Now()
+	if now.Sub(time.Unix(0, lastCleanup.Load())) < cleanupInterval {
+		return
+	}
+
+	// Only a successful run counts, so a failed cleanup (e.g. SQLITE_BUSY)
+	// is retried on the next poll instead of after cleanupInterval
 	if err := database.Cleanup(context.Background(), retention); err != nil {
 		log.Printf("Cleanup error: %v", err)
+		return
 	}
+	lastCleanup.Store(now.UnixNano())
 }
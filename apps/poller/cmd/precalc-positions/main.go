@@ -1,6 +1,7 @@
 package main
 
 import (
+	"bytes"
 	"context"
 	"encoding/json"
 	"flag"
@@ -251,23 +252,31 @@ func processNetworkDayType(ctx context.Context, database *db.DB, network string,
 		return nil
 	}
 
-	// Load stop times for all trips
-	tripStopTimes := make(map[string][]StopTime)
-	for _, trip := range trips {
-		stopTimes, err := loadTripStopTimes(ctx, database, network, trip.TripID)
-		if err != nil {
-			return fmt.Errorf("failed to load stop times for trip %s: %w", trip.TripID, err)
-		}
-		if len(stopTimes) >= 2 {
-			tripStopTimes[trip.TripID] = stopTimes
+	// Load stop times for all trips in one query, keeping trips with at
+	// least one segment
+	tripStopTimes, err := loadStopTimesForDate(ctx, database, network, dateStr)
+	if err != nil {
+		return fmt.Errorf("failed to load stop times: %w", err)
+	}
+	for tripID, stopTimes := range tripStopTimes {
+		if len(stopTimes) < 2 {
+			delete(tripStopTimes, tripID)
 		}
 	}
 
 	// Find operating hours
 	minSlot, maxSlot := findOperatingSlots(tripStopTimes)
 
+	// Insert every slot for this network/day type in one transaction; each
+	// autocommitted insert would otherwise pay its own WAL commit
+	tx, err := database.Conn().BeginTx(ctx, nil)
+	if err != nil {
+		return fmt.Errorf("failed to begin transaction: %w", err)
+	}
+	defer tx.Rollback()
+
 	// Prepare insert statement
-	insertStmt, err := database.Conn().PrepareContext(ctx, `
+	insertStmt, err := tx.PrepareContext(ctx, `
 		INSERT OR REPLACE INTO pre_schedule_positions (network, day_type, time_slot, positions_json, vehicle_count)
 		VALUES (?, ?, ?, ?, ?)
 	`)
@@ -285,10 +294,16 @@ func processNetworkDayType(ctx context.Context, database *db.DB, network string,
 	insertCount := 0
 	totalVehicles := 0
 
+	// Reused across slots: the positions slice and the JSON encode buffer
+	// keep their capacity instead of being reallocated for every slot
+	var positions []Position
+	var posJSON bytes.Buffer
+	encoder := json.NewEncoder(&posJSON)
+
 	for slot := minSlot; slot <= maxSlot; slot++ {
 		secondsSinceMidnight := slot * slotDurationSec
 
-		var positions []Position
+		positions = positions[:0]
 
 		for _, trip := range trips {
 			stopTimes, ok := tripStopTimes[trip.TripID]
@@ -303,12 +318,14 @@ func processNetworkDayType(ctx context.Context, database *db.DB, network string,
 		}
 
 		if len(positions) > 0 {
-			posJSON, err := json.Marshal(positions)
-			if err != nil {
+			posJSON.Reset()
+			if err := encoder.Encode(positions); err != nil {
 				return fmt.Errorf("failed to marshal positions: %w", err)
 			}
+			// Encode appends a newline that json.Marshal did not
+			data := bytes.TrimSuffix(posJSON.Bytes(), []byte("\n"))
 
-			if _, err := insertStmt.ExecContext(ctx, network, string(dayType), slot, string(posJSON), len(positions)); err != nil {
+			if _, err := insertStmt.ExecContext(ctx, network, string(dayType), slot, string(data), len(positions)); err != nil {
 				return fmt.Errorf("failed to insert slot %d: %w", slot, err)
 			}
 
@@ -317,6 +334,10 @@ func processNetworkDayType(ctx context.Context, database *db.DB, network string,
 		}
 	}
 
+	if err := tx.Commit(); err != nil {
+		return fmt.Errorf("failed to commit positions: %w", err)
+	}
+
 	elapsed := time.Since(startTime)
 	avgVehicles := 0
 	if insertCount > 0 {
@@ -355,33 +376,42 @@ func loadActiveTrips(ctx context.Context, database *db.DB, network, dateStr stri
 	return trips, rows.Err()
 }
 
-func loadTripStopTimes(ctx context.Context, database *db.DB, network, tripID string) ([]StopTime, error) {
+// loadStopTimesForDate returns the stop times of every trip of network
+// active on dateStr, keyed by trip ID and ordered by sequence
+func loadStopTimesForDate(ctx context.Context, database *db.DB, network, dateStr string) (map[string][]StopTime, error) {
 	query := `
-		SELECT st.stop_id, st.stop_sequence, st.arrival_seconds, st.departure_seconds,
+		WITH active AS (
+			SELECT DISTINCT t.trip_id
+			FROM dim_trips t
+			JOIN dim_calendar_dates cd ON cd.service_id = t.service_id AND cd.network = t.network
+			WHERE cd.date = ? AND cd.exception_type = 1 AND cd.network = ?
+		)
+		SELECT st.trip_id, st.stop_id, st.stop_sequence, st.arrival_seconds, st.departure_seconds,
 		       COALESCE(s.stop_name, ''), COALESCE(s.stop_lat, 0), COALESCE(s.stop_lon, 0)
-		FROM dim_stop_times st
+		FROM active a
+		JOIN dim_stop_times st ON st.trip_id = a.trip_id AND st.network = ?
 		LEFT JOIN dim_stops s ON s.stop_id = st.stop_id
-		WHERE st.trip_id = ? AND st.network = ?
-		ORDER BY st.stop_sequence
+		ORDER BY st.trip_id, st.stop_sequence
 	`
 
-	rows, err := database.Conn().QueryContext(ctx, query, tripID, network)
+	rows, err := database.Conn().QueryContext(ctx, query, dateStr, network, network)
 	if err != nil {
 		return nil, err
 	}
 	defer rows.Close()
 
-	var stops []StopTime
+	stopTimes := make(map[string][]StopTime)
 	for rows.Next() {
+		var tripID string
 		var st StopTime
-		if err := rows.Scan(&st.StopID, &st.StopSequence, &st.ArrivalSeconds, &st.DepartureSeconds,
+		if err := rows.Scan(&tripID, &st.StopID, &st.StopSequence, &st.ArrivalSeconds, &st.DepartureSeconds,
 			&st.StopName, &st.StopLat, &st.StopLon); err != nil {
 			return nil, err
 		}
-		stops = append(stops, st)
+		stopTimes[tripID] = append(stopTimes[tripID], st)
 	}
 
-	return stops, rows.Err()
+	return stopTimes, rows.Err()
 }
 
 func findOperatingSlots(tripStopTimes map[string][]StopTime) (int, int) {
@@ -2,11 +2,33 @@ package db
 
 import (
 	"context"
+	"encoding/json"
 	"fmt"
-	"strings"
 	"time"
 )
 
+// Statements for UpsertAlerts; insertRows appends the VALUES list
+const (
+	alertInsertSQL = `
+	INSERT INTO rt_alerts (alert_id, cause, effect, description_es, description_ca, description_en,
+		active_period_start, active_period_end, is_active, first_seen_at, last_seen_at)`
+	alertUpsertSQL = `
+	ON CONFLICT (alert_id) DO UPDATE SET
+		cause = excluded.cause,
+		effect = excluded.effect,
+		description_es = excluded.description_es,
+		description_ca = excluded.description_ca,
+		description_en = excluded.description_en,
+		active_period_start = excluded.active_period_start,
+		active_period_end = excluded.active_period_end,
+		is_active = 1,
+		last_seen_at = excluded.last_seen_at,
+		resolved_at = NULL`
+
+	alertEntityInsertSQL = `
+	INSERT INTO rt_alert_entities (alert_id, route_id, stop_id, trip_id)`
+)
+
 // Alert represents a service alert for database insertion
 type Alert struct {
 	AlertID           string
@@ -37,68 +59,72 @@ func (db *DB) UpsertAlerts(ctx context.Context, alerts []Alert) error {
 	db.LockWrite()
 	defer db.UnlockWrite()
 
-	tx, err := db.conn.BeginTx(ctx, nil)
-	if err != nil {
-		return fmt.Errorf("failed to begin transaction: %w", err)
-	}
-	defer tx.Rollback()
-
 	now := time.Now().UTC().Format(time.RFC3339)
 
-	alertStmt, err := tx.PrepareContext(ctx, `
-		INSERT INTO rt_alerts (alert_id, cause, effect, description_es, description_ca, description_en,
-			active_period_start, active_period_end, is_active, first_seen_at, last_seen_at)
-		VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, ?, ?)
-		ON CONFLICT (alert_id) DO UPDATE SET
-			cause = excluded.cause,
-			effect = excluded.effect,
-			description_es = excluded.description_es,
-			description_ca = excluded.description_ca,
-			description_en = excluded.description_en,
-			active_period_start = excluded.active_period_start,
-			active_period_end = excluded.active_period_end,
-			is_active = 1,
-			last_seen_at = excluded.last_seen_at,
-			resolved_at = NULL
-	`)
-	if err != nil {
-		return fmt.Errorf("failed to prepare alert statement: %w", err)
+	// An alert's entities are replaced wholesale, so if the feed repeats an
+	// alert only its last occurrence contributes entities
+	lastIdx := make(map[string]int, len(alerts))
+	for i, a := range alerts {
+		lastIdx[a.AlertID] = i
 	}
-	defer alertStmt.Close()
 
-	entityStmt, err := tx.PrepareContext(ctx, `
-		INSERT INTO rt_alert_entities (alert_id, route_id, stop_id, trip_id)
-		VALUES (?, ?, ?, ?)
-	`)
-	if err != nil {
-		return fmt.Errorf("failed to prepare entity statement: %w", err)
-	}
-	defer entityStmt.Close()
-
-	for _, a := range alerts {
+	alertRows := make([][]interface{}, len(alerts))
+	var entityRows [][]interface{}
+	for i, a := range alerts {
 		lastSeenStr := a.LastSeenAt.Format(time.RFC3339)
-		_, err := alertStmt.ExecContext(ctx,
+		alertRows[i] = []interface{}{
 			a.AlertID, a.Cause, a.Effect,
 			a.DescriptionES, a.DescriptionCA, a.DescriptionEN,
 			a.ActivePeriodStart, a.ActivePeriodEnd,
-			now, lastSeenStr,
-		)
-		if err != nil {
-			return fmt.Errorf("failed to upsert alert %s: %w", a.AlertID, err)
+			1, now, lastSeenStr,
 		}
 
-		// Replace entities for this alert
-		if _, err := tx.ExecContext(ctx, "DELETE FROM rt_alert_entities WHERE alert_id = ?", a.AlertID); err != nil {
-			return fmt.Errorf("failed to clear entities for alert %s: %w", a.AlertID, err)
+		if lastIdx[a.AlertID] != i {
+			continue
 		}
-
 		for _, e := range a.Entities {
-			if _, err := entityStmt.ExecContext(ctx, a.AlertID, e.RouteID, e.StopID, e.TripID); err != nil {
-				return fmt.Errorf("failed to insert entity for alert %s: %w", a.AlertID, err)
-			}
+			entityRows = append(entityRows, []interface{}{a.AlertID, e.RouteID, e.StopID, e.TripID})
 		}
 	}
 
+	alertIDs := make([]string, 0, len(lastIdx))
+	for id := range lastIdx {
+		alertIDs = append(alertIDs, id)
+	}
+	idsJSON, err := json.Marshal(alertIDs)
+	if err != nil {
+		return fmt.Errorf("failed to encode alert IDs: %w", err)
+	}
+
+	if err := db.prepareInserts(ctx, alertInsertSQL, alertUpsertSQL, alertRows); err != nil {
+		return fmt.Errorf("failed to prepare alert statement: %w", err)
+	}
+	if err := db.prepareInserts(ctx, alertEntityInsertSQL, "", entityRows); err != nil {
+		return fmt.Errorf("failed to prepare entity statement: %w", err)
+	}
+
+	tx, err := db.conn.BeginTx(ctx, nil)
+	if err != nil {
+		return fmt.Errorf("failed to begin transaction: %w", err)
+	}
+	defer tx.Rollback()
+
+	if err := db.insertRows(ctx, tx, alertInsertSQL, alertUpsertSQL, alertRows); err != nil {
+		return fmt.Errorf("failed to upsert alerts: %w", err)
+	}
+
+	// Replace entities for these alerts
+	if _, err := tx.ExecContext(ctx,
+		"DELETE FROM rt_alert_entities WHERE alert_id IN (SELECT value FROM json_each(?))",
+		string(idsJSON),
+	); err != nil {
+		return fmt.Errorf("failed to clear alert entities: %w", err)
+	}
+
+	if err := db.insertRows(ctx, tx, alertEntityInsertSQL, "", entityRows); err != nil {
+		return fmt.Errorf("failed to insert alert entities: %w", err)
+	}
+
 	return tx.Commit()
 }
 
@@ -118,19 +144,16 @@ func (db *DB) MarkResolvedAlerts(ctx context.Context, activeIDs []string) error
 		return err
 	}
 
-	// Build placeholders
-	placeholders := make([]string, len(activeIDs))
-	args := make([]interface{}, 0, len(activeIDs)+1)
-	args = append(args, now)
-	for i, id := range activeIDs {
-		placeholders[i] = "?"
-		args = append(args, id)
+	// Bind the active set as one JSON array instead of a placeholder per ID,
+	// so the statement text is constant and never hits SQLite's variable limit
+	idsJSON, err := json.Marshal(activeIDs)
+	if err != nil {
+		return fmt.Errorf("failed to encode active alert IDs: %w", err)
 	}
 
-	query := fmt.Sprintf(
-		"UPDATE rt_alerts SET is_active = 0, resolved_at = ? WHERE is_active = 1 AND alert_id NOT IN (%s)",
-		strings.Join(placeholders, ","),
+	_, err = db.conn.ExecContext(ctx,
+		"UPDATE rt_alerts SET is_active = 0, resolved_at = ? WHERE is_active = 1 AND alert_id NOT IN (SELECT value FROM json_each(?))",
+		now, string(idsJSON),
 	)
-	_, err := db.conn.ExecContext(ctx, query, args...)
 	return err
 }
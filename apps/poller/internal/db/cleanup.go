@@ -17,36 +17,58 @@ func (db *DB) Cleanup(ctx context.Context, retention time.Duration) error {
 		hours = 1
 	}
 
+	// Timestamps are stored as RFC3339 UTC strings, which sort
+	// lexicographically in time order. Comparing the raw column against a
+	// bound cutoff keeps the statements constant and lets SQLite use the
+	// timestamp indexes; wrapping the column in datetime() forces a scan.
+	now := time.Now().UTC()
+	historyCutoff := now.Add(-time.Duration(hours) * time.Hour).Format(time.RFC3339)
+	statsCutoff := now.AddDate(0, 0, -30).Format(time.RFC3339)
+
 	// Delete old history records
 	queries := []struct {
 		name  string
 		query string
+		arg   string
 	}{
 		{
 			name:  "rodalies_history",
-			query: fmt.Sprintf("DELETE FROM rt_rodalies_vehicle_history WHERE datetime(polled_at_utc) < datetime('now', '-%d hours')", hours),
+			query: "DELETE FROM rt_rodalies_vehicle_history WHERE polled_at_utc < ?",
+			arg:   historyCutoff,
 		},
 		{
 			name:  "metro_history",
-			query: fmt.Sprintf("DELETE FROM rt_metro_vehicle_history WHERE datetime(polled_at_utc) < datetime('now', '-%d hours')", hours),
+			query: "DELETE FROM rt_metro_vehicle_history WHERE polled_at_utc < ?",
+			arg:   historyCutoff,
 		},
 		{
 			name:  "snapshots",
-			query: fmt.Sprintf("DELETE FROM rt_snapshots WHERE datetime(polled_at_utc) < datetime('now', '-%d hours')", hours),
+			query: "DELETE FROM rt_snapshots WHERE polled_at_utc < ?",
+			arg:   historyCutoff,
 		},
 		{
 			name:  "delay_stats",
-			query: "DELETE FROM stats_delay_hourly WHERE datetime(hour_bucket) < datetime('now', '-30 days')",
+			query: "DELETE FROM stats_delay_hourly WHERE hour_bucket < ?",
+			arg:   statsCutoff,
 		},
 		{
 			name:  "resolved_alerts",
-			query: "DELETE FROM rt_alerts WHERE is_active = 0 AND datetime(resolved_at) < datetime('now', '-30 days')",
+			query: "DELETE FROM rt_alerts WHERE is_active = 0 AND resolved_at < ?",
+			arg:   statsCutoff,
 		},
 	}
 
+	// Run every delete in one transaction so the batch pays for a single
+	// WAL commit instead of one per table
+	tx, err := db.conn.BeginTx(ctx, nil)
+	if err != nil {
+		return fmt.Errorf("failed to begin transaction: %w", err)
+	}
+	defer tx.Rollback()
+
 	totalDeleted := 0
 	for _, q := range queries {
-		result, err := db.conn.ExecContext(ctx, q.query)
+		result, err := tx.ExecContext(ctx, q.query, q.arg)
 		if err != nil {
 			return fmt.Errorf("failed to cleanup %s: %w", q.name, err)
 		}
@@ -54,8 +76,18 @@ func (db *DB) Cleanup(ctx context.Context, retention time.Duration) error {
 		totalDeleted += int(rows)
 	}
 
+	if err := tx.Commit(); err != nil {
+		return fmt.Errorf("failed to commit cleanup: %w", err)
+	}
+
 	if totalDeleted > 0 {
 		log.Printf("Cleanup: deleted %d records older than %d hours", totalDeleted, hours)
+
+		// Large deletes are written to the WAL first; checkpoint and truncate
+		// it so the freed history pages don't keep the -wal file bloated
+		if _, err := db.conn.ExecContext(ctx, "PRAGMA wal_checkpoint(TRUNCATE)"); err != nil {
+			log.Printf("Warning: WAL checkpoint after cleanup failed: %v", err)
+		}
 	}
 
 	return nil
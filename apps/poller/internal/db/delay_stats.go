@@ -2,7 +2,6 @@ package db
 
 import (
 	"context"
-	"database/sql"
 	"fmt"
 	"math"
 	"time"
@@ -48,24 +47,38 @@ func (db *DB) UpdateDelayStats(ctx context.Context, observations []DelayObservat
 	}
 	defer tx.Rollback()
 
+	// Each batch is summarised in Go, then merged into the stored row by the
+	// upsert itself using the parallel form of Welford's algorithm (Chan et
+	// al.), so existing stats never need to be read back out. SET expressions
+	// see the pre-update row, so the old count/mean are used consistently.
+	stmt, err := tx.PrepareContext(ctx, `
+		INSERT INTO stats_delay_hourly (route_id, hour_bucket, observation_count,
+			delay_mean_seconds, delay_m2, delayed_count, on_time_count, max_delay_seconds)
+		VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+		ON CONFLICT (route_id, hour_bucket) DO UPDATE SET
+			observation_count = observation_count + excluded.observation_count,
+			delay_mean_seconds = delay_mean_seconds
+				+ (excluded.delay_mean_seconds - delay_mean_seconds) * excluded.observation_count
+				/ (observation_count + excluded.observation_count),
+			delay_m2 = delay_m2 + excluded.delay_m2
+				+ (excluded.delay_mean_seconds - delay_mean_seconds) * (excluded.delay_mean_seconds - delay_mean_seconds)
+				* observation_count * excluded.observation_count
+				/ (observation_count + excluded.observation_count),
+			delayed_count = delayed_count + excluded.delayed_count,
+			on_time_count = on_time_count + excluded.on_time_count,
+			max_delay_seconds = MAX(max_delay_seconds, excluded.max_delay_seconds)
+	`)
+	if err != nil {
+		return fmt.Errorf("failed to prepare delay stats upsert: %w", err)
+	}
+	defer stmt.Close()
+
 	for routeID, delays := range byRoute {
-		// Read existing row
+		// Apply Welford's algorithm to this batch's observations
 		var count int
 		var mean, m2 float64
 		var delayedCount, onTimeCount, maxDelay int
 
-		err := tx.QueryRowContext(ctx, `
-			SELECT observation_count, delay_mean_seconds, delay_m2,
-				delayed_count, on_time_count, max_delay_seconds
-			FROM stats_delay_hourly
-			WHERE route_id = ? AND hour_bucket = ?
-		`, routeID, hourBucket).Scan(&count, &mean, &m2, &delayedCount, &onTimeCount, &maxDelay)
-
-		if err != nil && err != sql.ErrNoRows {
-			return fmt.Errorf("failed to read delay stats for %s: %w", routeID, err)
-		}
-
-		// Apply Welford's algorithm for each new observation
 		for _, delaySec := range delays {
 			absDelay := int(math.Abs(float64(delaySec)))
 
@@ -85,20 +98,7 @@ func (db *DB) UpdateDelayStats(ctx context.Context, observations []DelayObservat
 			}
 		}
 
-		// Upsert
-		_, err = tx.ExecContext(ctx, `
-			INSERT INTO stats_delay_hourly (route_id, hour_bucket, observation_count,
-				delay_mean_seconds, delay_m2, delayed_count, on_time_count, max_delay_seconds)
-			VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-			ON CONFLICT (route_id, hour_bucket) DO UPDATE SET
-				observation_count = excluded.observation_count,
-				delay_mean_seconds = excluded.delay_mean_seconds,
-				delay_m2 = excluded.delay_m2,
-				delayed_count = excluded.delayed_count,
-				on_time_count = excluded.on_time_count,
-				max_delay_seconds = excluded.max_delay_seconds
-		`, routeID, hourBucket, count, mean, m2, delayedCount, onTimeCount, maxDelay)
-		if err != nil {
+		if _, err := stmt.ExecContext(ctx, routeID, hourBucket, count, mean, m2, delayedCount, onTimeCount, maxDelay); err != nil {
 			return fmt.Errorf("failed to upsert delay stats for %s: %w", routeID, err)
 		}
 	}
@@ -3,7 +3,6 @@ package db
 import (
 	"context"
 	"database/sql"
-	"encoding/json"
 	"time"
 
 	"github.com/mini-rodalies-3d/poller/internal/metrics"
@@ -130,26 +129,22 @@ func (db *DB) getScheduleVehicleCount(ctx context.Context, network metrics.Netwo
 
 	totalCount := 0
 	for _, netName := range networkNames {
+		// vehicle_count is written alongside positions_json by precalc-positions,
+		// so read it directly instead of decoding the whole array to count it
 		query := `
-			SELECT positions_json
+			SELECT vehicle_count
 			FROM pre_schedule_positions
 			WHERE network = ? AND day_type = ? AND time_slot = ?
 		`
-		var positionsJSON string
-		err := db.conn.QueryRowContext(ctx, query, netName, dayType, timeSlot).Scan(&positionsJSON)
+		var count int
+		err := db.conn.QueryRowContext(ctx, query, netName, dayType, timeSlot).Scan(&count)
 		if err == sql.ErrNoRows {
 			continue
 		}
 		if err != nil {
 			continue
 		}
-
-		// Parse JSON array to count vehicles
-		var positions []map[string]interface{}
-		if err := json.Unmarshal([]byte(positionsJSON), &positions); err != nil {
-			continue
-		}
-		totalCount += len(positions)
+		totalCount += count
 	}
 
 	return totalCount, nil
@@ -93,6 +93,9 @@ CREATE INDEX IF NOT EXISTS idx_rodalies_history_vehicle
     ON rt_rodalies_vehicle_history(vehicle_key, polled_at_utc DESC);
 CREATE INDEX IF NOT EXISTS idx_rodalies_history_route
     ON rt_rodalies_vehicle_history(route_id, polled_at_utc DESC);
+-- Time-only index for retention cleanup range deletes
+CREATE INDEX IF NOT EXISTS idx_rodalies_history_polled
+    ON rt_rodalies_vehicle_history(polled_at_utc);
 
 
 -- =============================================================================
@@ -153,6 +156,9 @@ CREATE INDEX IF NOT EXISTS idx_metro_history_vehicle
     ON rt_metro_vehicle_history(vehicle_key, polled_at_utc DESC);
 CREATE INDEX IF NOT EXISTS idx_metro_history_line
     ON rt_metro_vehicle_history(line_code, polled_at_utc DESC);
+-- Time-only index for retention cleanup and previous-poll lookups
+CREATE INDEX IF NOT EXISTS idx_metro_history_polled
+    ON rt_metro_vehicle_history(polled_at_utc);
 
 
 -- =============================================================================
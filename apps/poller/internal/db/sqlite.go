@@ -5,6 +5,7 @@ import (
 	"database/sql"
 	_ "embed"
 	"fmt"
+	"hash/fnv"
 	"log"
 	"sync"
 	"time"
@@ -19,10 +20,21 @@ import (
 //go:embed schema.sql
 var schemaSQL string
 
+// schemaVersion fingerprints schemaSQL. EnsureSchema stores it in SQLite's
+// user_version so an unchanged schema is not re-applied on every start.
+var schemaVersion = func() int32 {
+	h := fnv.New32a()
+	h.Write([]byte(schemaSQL))
+	return int32(h.Sum32()&0x7fffffff) | 1 // never 0, the value of a fresh database
+}()
+
 // DB wraps a SQLite database connection with write serialization
 type DB struct {
 	conn    *sql.DB
 	writeMu sync.Mutex // Serializes all write operations to prevent transaction conflicts
+
+	stmtMu sync.Mutex
+	stmts  map[string]*sql.Stmt // Prepared position-writer statements, by query text
 }
 
 // Connect opens a SQLite database with WAL mode enabled
@@ -67,11 +79,46 @@ func Connect(dbPath string) (*DB, error) {
 	return &DB{conn: conn}, nil
 }
 
-// Close closes the database connection
+// Close closes the cached statements and the database connection
 func (db *DB) Close() error {
+	db.stmtMu.Lock()
+	for _, stmt := range db.stmts {
+		stmt.Close()
+	}
+	db.stmts = nil
+	db.stmtMu.Unlock()
+
 	return db.conn.Close()
 }
 
+// prepareStmt prepares query on the connection and caches it for cachedStmt.
+// The cache holds one statement per batch shape the writers use, so it stays
+// bounded by maxInsertParams.
+func (db *DB) prepareStmt(ctx context.Context, query string) error {
+	db.stmtMu.Lock()
+	defer db.stmtMu.Unlock()
+
+	if _, ok := db.stmts[query]; ok {
+		return nil
+	}
+	stmt, err := db.conn.PrepareContext(ctx, query)
+	if err != nil {
+		return err
+	}
+	if db.stmts == nil {
+		db.stmts = make(map[string]*sql.Stmt)
+	}
+	db.stmts[query] = stmt
+	return nil
+}
+
+// cachedStmt returns the statement prepareStmt cached for query, or nil
+func (db *DB) cachedStmt(query string) *sql.Stmt {
+	db.stmtMu.Lock()
+	defer db.stmtMu.Unlock()
+	return db.stmts[query]
+}
+
 // Conn returns the underlying database connection for use by writers
 func (db *DB) Conn() *sql.DB {
 	return db.conn
@@ -90,16 +137,32 @@ func (db *DB) UnlockWrite() {
 }
 
 // EnsureSchema creates tables if they don't exist.
-// Uses the embedded schema.sql file as the single source of truth.
+// Uses the embedded schema.sql file as the single source of truth, and skips
+// it when the database was last set up from the same schema.
 func (db *DB) EnsureSchema(ctx context.Context) error {
 	db.LockWrite()
 	defer db.UnlockWrite()
 
+	var version int32
+	if err := db.conn.QueryRowContext(ctx, "PRAGMA user_version").Scan(&version); err == nil && version == schemaVersion {
+		// schema.sql also enables foreign keys on the connection
+		if _, err := db.conn.ExecContext(ctx, "PRAGMA foreign_keys = ON"); err != nil {
+			return fmt.Errorf("failed to enable foreign keys: %w", err)
+		}
+		log.Println("Database schema up to date (from embedded schema.sql)")
+		return nil
+	}
+
 	_, err := db.conn.ExecContext(ctx, schemaSQL)
 	if err != nil {
 		return fmt.Errorf("failed to create schema: %w", err)
 	}
 
+	// PRAGMA values can't be bound as parameters
+	if _, err := db.conn.ExecContext(ctx, fmt.Sprintf("PRAGMA user_version = %d", schemaVersion)); err != nil {
+		return fmt.Errorf("failed to record schema version: %w", err)
+	}
+
 	log.Println("Database schema ensured (from embedded schema.sql)")
 	return nil
 }
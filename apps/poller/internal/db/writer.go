@@ -2,12 +2,81 @@ package db
 
 import (
 	"context"
+	"database/sql"
+	"encoding/json"
 	"fmt"
+	"strings"
+	"sync"
 	"time"
 
 	"github.com/google/uuid"
 )
 
+// Statements for the position writers. insertRows appends the VALUES list
+// (and the upsert tail, if any) for each batch.
+const (
+	rodaliesCurrentInsertSQL = `
+	INSERT INTO rt_rodalies_vehicle_current (
+		vehicle_key, snapshot_id, vehicle_id, entity_id, vehicle_label,
+		trip_id, route_id, current_stop_id, previous_stop_id, next_stop_id,
+		next_stop_sequence, status, latitude, longitude, vehicle_timestamp_utc,
+		polled_at_utc, arrival_delay_seconds, departure_delay_seconds,
+		schedule_relationship, predicted_arrival_utc, predicted_departure_utc,
+		trip_update_timestamp_utc, updated_at
+	)`
+	rodaliesCurrentUpsertSQL = `
+	ON CONFLICT (vehicle_key) DO UPDATE SET
+		snapshot_id = excluded.snapshot_id,
+		vehicle_id = excluded.vehicle_id,
+		entity_id = excluded.entity_id,
+		vehicle_label = excluded.vehicle_label,
+		trip_id = excluded.trip_id,
+		route_id = excluded.route_id,
+		current_stop_id = excluded.current_stop_id,
+		previous_stop_id = excluded.previous_stop_id,
+		next_stop_id = excluded.next_stop_id,
+		next_stop_sequence = excluded.next_stop_sequence,
+		status = excluded.status,
+		latitude = excluded.latitude,
+		longitude = excluded.longitude,
+		vehicle_timestamp_utc = excluded.vehicle_timestamp_utc,
+		polled_at_utc = excluded.polled_at_utc,
+		arrival_delay_seconds = excluded.arrival_delay_seconds,
+		departure_delay_seconds = excluded.departure_delay_seconds,
+		schedule_relationship = excluded.schedule_relationship,
+		predicted_arrival_utc = excluded.predicted_arrival_utc,
+		predicted_departure_utc = excluded.predicted_departure_utc,
+		trip_update_timestamp_utc = excluded.trip_update_timestamp_utc,
+		updated_at = excluded.updated_at`
+
+	rodaliesHistoryInsertSQL = `
+	INSERT OR IGNORE INTO rt_rodalies_vehicle_history (
+		vehicle_key, snapshot_id, vehicle_id, entity_id, vehicle_label,
+		trip_id, route_id, current_stop_id, previous_stop_id, next_stop_id,
+		next_stop_sequence, status, latitude, longitude, vehicle_timestamp_utc,
+		polled_at_utc, arrival_delay_seconds, departure_delay_seconds,
+		schedule_relationship, predicted_arrival_utc, predicted_departure_utc,
+		trip_update_timestamp_utc
+	)`
+
+	metroCurrentInsertSQL = `
+	INSERT INTO rt_metro_vehicle_current (
+		vehicle_key, snapshot_id, line_code, route_id, direction_id,
+		latitude, longitude, bearing, previous_stop_id, next_stop_id,
+		previous_stop_name, next_stop_name, status, progress_fraction,
+		distance_along_line, estimated_speed_mps, line_total_length,
+		source, confidence, arrival_seconds_to_next, estimated_at_utc,
+		polled_at_utc, updated_at
+	)`
+
+	metroHistoryInsertSQL = `
+	INSERT OR IGNORE INTO rt_metro_vehicle_history (
+		vehicle_key, snapshot_id, line_code, direction_id,
+		latitude, longitude, bearing, previous_stop_id, next_stop_id,
+		status, progress_fraction, polled_at_utc
+	)`
+)
+
 // CreateSnapshot creates a new snapshot record and returns its ID
 func (db *DB) CreateSnapshot(ctx context.Context, polledAt time.Time) (string, error) {
 	db.LockWrite()
@@ -56,74 +125,19 @@ func (db *DB) UpsertRodaliesPositions(ctx context.Context, snapshotID string, po
 	db.LockWrite()
 	defer db.UnlockWrite()
 
-	tx, err := db.conn.BeginTx(ctx, nil)
-	if err != nil {
-		return fmt.Errorf("failed to begin transaction: %w", err)
-	}
-	defer tx.Rollback()
-
 	polledAtStr := polledAt.UTC().Format(time.RFC3339)
 
 	// Use explicit UTC timestamp for updated_at to ensure consistency across containers
 	// (SQLite's datetime('now') could differ between poller and API containers due to clock skew)
 	updatedAtStr := time.Now().UTC().Format(time.RFC3339)
 
-	// Prepare upsert statement for current table
-	currentStmt, err := tx.PrepareContext(ctx, `
-		INSERT INTO rt_rodalies_vehicle_current (
-			vehicle_key, snapshot_id, vehicle_id, entity_id, vehicle_label,
-			trip_id, route_id, current_stop_id, previous_stop_id, next_stop_id,
-			next_stop_sequence, status, latitude, longitude, vehicle_timestamp_utc,
-			polled_at_utc, arrival_delay_seconds, departure_delay_seconds,
-			schedule_relationship, predicted_arrival_utc, predicted_departure_utc,
-			trip_update_timestamp_utc, updated_at
-		) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-		ON CONFLICT (vehicle_key) DO UPDATE SET
-			snapshot_id = excluded.snapshot_id,
-			vehicle_id = excluded.vehicle_id,
-			entity_id = excluded.entity_id,
-			vehicle_label = excluded.vehicle_label,
-			trip_id = excluded.trip_id,
-			route_id = excluded.route_id,
-			current_stop_id = excluded.current_stop_id,
-			previous_stop_id = excluded.previous_stop_id,
-			next_stop_id = excluded.next_stop_id,
-			next_stop_sequence = excluded.next_stop_sequence,
-			status = excluded.status,
-			latitude = excluded.latitude,
-			longitude = excluded.longitude,
-			vehicle_timestamp_utc = excluded.vehicle_timestamp_utc,
-			polled_at_utc = excluded.polled_at_utc,
-			arrival_delay_seconds = excluded.arrival_delay_seconds,
-			departure_delay_seconds = excluded.departure_delay_seconds,
-			schedule_relationship = excluded.schedule_relationship,
-			predicted_arrival_utc = excluded.predicted_arrival_utc,
-			predicted_departure_utc = excluded.predicted_departure_utc,
-			trip_update_timestamp_utc = excluded.trip_update_timestamp_utc,
-			updated_at = excluded.updated_at
-	`)
-	if err != nil {
-		return fmt.Errorf("failed to prepare current statement: %w", err)
-	}
-	defer currentStmt.Close()
-
-	// Prepare insert statement for history table
-	historyStmt, err := tx.PrepareContext(ctx, `
-		INSERT OR IGNORE INTO rt_rodalies_vehicle_history (
-			vehicle_key, snapshot_id, vehicle_id, entity_id, vehicle_label,
-			trip_id, route_id, current_stop_id, previous_stop_id, next_stop_id,
-			next_stop_sequence, status, latitude, longitude, vehicle_timestamp_utc,
-			polled_at_utc, arrival_delay_seconds, departure_delay_seconds,
-			schedule_relationship, predicted_arrival_utc, predicted_departure_utc,
-			trip_update_timestamp_utc
-		) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-	`)
-	if err != nil {
-		return fmt.Errorf("failed to prepare history statement: %w", err)
-	}
-	defer historyStmt.Close()
-
-	for _, p := range positions {
+	// All rows share one backing array: each history row is the first 22
+	// columns of its current row, which adds updated_at
+	const currentWidth = 23
+	values := make([]interface{}, 0, len(positions)*currentWidth)
+	currentRows := make([][]interface{}, len(positions))
+	historyRows := make([][]interface{}, len(positions))
+	for i, p := range positions {
 		var vehicleTS, predArr, predDep, tripUpTS *string
 		if p.VehicleTimestamp != nil {
 			s := p.VehicleTimestamp.UTC().Format(time.RFC3339)
@@ -142,25 +156,42 @@ func (db *DB) UpsertRodaliesPositions(ctx context.Context, snapshotID string, po
 			tripUpTS = &s
 		}
 
-		// Base args for history table (22 columns)
-		historyArgs := []interface{}{
+		// Current table args include updated_at (23 columns)
+		values = append(values,
 			p.VehicleKey, snapshotID, p.VehicleID, p.EntityID, p.VehicleLabel,
 			p.TripID, p.RouteID, p.CurrentStopID, p.PreviousStopID, p.NextStopID,
 			p.NextStopSequence, p.Status, p.Latitude, p.Longitude, vehicleTS,
 			polledAtStr, p.ArrivalDelaySeconds, p.DepartureDelaySeconds,
-			p.ScheduleRelationship, predArr, predDep, tripUpTS,
-		}
+			p.ScheduleRelationship, predArr, predDep, tripUpTS, updatedAtStr,
+		)
+		currentRows[i] = values[i*currentWidth : (i+1)*currentWidth]
 
-		// Current table args include updated_at (23 columns)
-		currentArgs := append(historyArgs, updatedAtStr)
+		// History table args are the same minus updated_at (22 columns)
+		historyRows[i] = currentRows[i][:currentWidth-1]
+	}
 
-		if _, err := currentStmt.ExecContext(ctx, currentArgs...); err != nil {
-			return fmt.Errorf("failed to upsert position %s: %w", p.VehicleKey, err)
-		}
+	if err := db.prepareInserts(ctx, rodaliesCurrentInsertSQL, rodaliesCurrentUpsertSQL, currentRows); err != nil {
+		return fmt.Errorf("failed to prepare upsert: %w", err)
+	}
+	if err := db.prepareInserts(ctx, rodaliesHistoryInsertSQL, "", historyRows); err != nil {
+		return fmt.Errorf("failed to prepare history insert: %w", err)
+	}
 
-		if _, err := historyStmt.ExecContext(ctx, historyArgs...); err != nil {
-			return fmt.Errorf("failed to insert history %s: %w", p.VehicleKey, err)
-		}
+	tx, err := db.conn.BeginTx(ctx, nil)
+	if err != nil {
+		return fmt.Errorf("failed to begin transaction: %w", err)
+	}
+	defer tx.Rollback()
+
+	// Upsert the current table in batches; a later row for the same vehicle
+	// within a batch updates the earlier one, as separate statements did
+	if err := db.insertRows(ctx, tx, rodaliesCurrentInsertSQL, rodaliesCurrentUpsertSQL, currentRows); err != nil {
+		return fmt.Errorf("failed to upsert positions: %w", err)
+	}
+
+	// Insert into history table
+	if err := db.insertRows(ctx, tx, rodaliesHistoryInsertSQL, "", historyRows); err != nil {
+		return fmt.Errorf("failed to insert history: %w", err)
 	}
 
 	return tx.Commit()
@@ -196,58 +227,22 @@ func (db *DB) UpsertMetroPositions(ctx context.Context, snapshotID string, polle
 	db.LockWrite()
 	defer db.UnlockWrite()
 
-	tx, err := db.conn.BeginTx(ctx, nil)
-	if err != nil {
-		return fmt.Errorf("failed to begin transaction: %w", err)
-	}
-	defer tx.Rollback()
-
 	polledAtStr := polledAt.UTC().Format(time.RFC3339)
 
 	// Use explicit UTC timestamp for updated_at to ensure consistency across containers
 	updatedAtStr := time.Now().UTC().Format(time.RFC3339)
 
-	// Clear current table to remove stale positions from previous polls
-	// This is necessary because trains that are no longer reported (filtered out or service ended)
-	// would otherwise remain indefinitely in the current table
-	if _, err := tx.ExecContext(ctx, "DELETE FROM rt_metro_vehicle_current"); err != nil {
-		return fmt.Errorf("failed to clear metro current table: %w", err)
-	}
-
-	// Prepare insert statement for current table (no ON CONFLICT needed since we clear first)
-	currentStmt, err := tx.PrepareContext(ctx, `
-		INSERT INTO rt_metro_vehicle_current (
-			vehicle_key, snapshot_id, line_code, route_id, direction_id,
-			latitude, longitude, bearing, previous_stop_id, next_stop_id,
-			previous_stop_name, next_stop_name, status, progress_fraction,
-			distance_along_line, estimated_speed_mps, line_total_length,
-			source, confidence, arrival_seconds_to_next, estimated_at_utc,
-			polled_at_utc, updated_at
-		) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-	`)
-	if err != nil {
-		return fmt.Errorf("failed to prepare current statement: %w", err)
-	}
-	defer currentStmt.Close()
-
-	// Prepare insert statement for history table
-	historyStmt, err := tx.PrepareContext(ctx, `
-		INSERT OR IGNORE INTO rt_metro_vehicle_history (
-			vehicle_key, snapshot_id, line_code, direction_id,
-			latitude, longitude, bearing, previous_stop_id, next_stop_id,
-			status, progress_fraction, polled_at_utc
-		) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-	`)
-	if err != nil {
-		return fmt.Errorf("failed to prepare history statement: %w", err)
-	}
-	defer historyStmt.Close()
-
-	for _, p := range positions {
+	// One backing array per table instead of one allocation per row
+	const currentWidth, historyWidth = 23, 12
+	currentValues := make([]interface{}, 0, len(positions)*currentWidth)
+	historyValues := make([]interface{}, 0, len(positions)*historyWidth)
+	currentRows := make([][]interface{}, len(positions))
+	historyRows := make([][]interface{}, len(positions))
+	for i, p := range positions {
 		estimatedAtStr := p.EstimatedAt.UTC().Format(time.RFC3339)
 
 		// Current table (includes updated_at)
-		_, err := currentStmt.ExecContext(ctx,
+		currentValues = append(currentValues,
 			p.VehicleKey, snapshotID, p.LineCode, p.RouteID, p.DirectionID,
 			p.Latitude, p.Longitude, p.Bearing, p.PreviousStopID, p.NextStopID,
 			p.PreviousStopName, p.NextStopName, p.Status, p.ProgressFraction,
@@ -255,19 +250,45 @@ func (db *DB) UpsertMetroPositions(ctx context.Context, snapshotID string, polle
 			p.Source, p.Confidence, p.ArrivalSecondsToNext, estimatedAtStr,
 			polledAtStr, updatedAtStr,
 		)
-		if err != nil {
-			return fmt.Errorf("failed to upsert metro position %s: %w", p.VehicleKey, err)
-		}
+		currentRows[i] = currentValues[i*currentWidth : (i+1)*currentWidth]
 
 		// History table
-		_, err = historyStmt.ExecContext(ctx,
+		historyValues = append(historyValues,
 			p.VehicleKey, snapshotID, p.LineCode, p.DirectionID,
 			p.Latitude, p.Longitude, p.Bearing, p.PreviousStopID, p.NextStopID,
 			p.Status, p.ProgressFraction, polledAtStr,
 		)
-		if err != nil {
-			return fmt.Errorf("failed to insert metro history %s: %w", p.VehicleKey, err)
-		}
+		historyRows[i] = historyValues[i*historyWidth : (i+1)*historyWidth]
+	}
+
+	if err := db.prepareInserts(ctx, metroCurrentInsertSQL, "", currentRows); err != nil {
+		return fmt.Errorf("failed to prepare metro insert: %w", err)
+	}
+	if err := db.prepareInserts(ctx, metroHistoryInsertSQL, "", historyRows); err != nil {
+		return fmt.Errorf("failed to prepare metro history insert: %w", err)
+	}
+
+	tx, err := db.conn.BeginTx(ctx, nil)
+	if err != nil {
+		return fmt.Errorf("failed to begin transaction: %w", err)
+	}
+	defer tx.Rollback()
+
+	// Clear current table to remove stale positions from previous polls
+	// This is necessary because trains that are no longer reported (filtered out or service ended)
+	// would otherwise remain indefinitely in the current table
+	if _, err := tx.ExecContext(ctx, "DELETE FROM rt_metro_vehicle_current"); err != nil {
+		return fmt.Errorf("failed to clear metro current table: %w", err)
+	}
+
+	// Insert into current table (no ON CONFLICT needed since we clear first)
+	if err := db.insertRows(ctx, tx, metroCurrentInsertSQL, "", currentRows); err != nil {
+		return fmt.Errorf("failed to insert metro positions: %w", err)
+	}
+
+	// Insert into history table
+	if err := db.insertRows(ctx, tx, metroHistoryInsertSQL, "", historyRows); err != nil {
+		return fmt.Errorf("failed to insert metro history: %w", err)
 	}
 
 	return tx.Commit()
@@ -312,42 +333,68 @@ type AdjacentStops struct {
 	StopSequence   int
 }
 
-// GetAdjacentStops looks up the previous and next stops for a given trip and stop
-// from the GTFS dimension tables
-func (db *DB) GetAdjacentStops(ctx context.Context, tripID, stopID string) (*AdjacentStops, error) {
-	// First, get the stop_sequence for the given stop
-	var stopSeq int
-	err := db.conn.QueryRowContext(ctx, `
-		SELECT stop_sequence FROM dim_stop_times
-		WHERE trip_id = ? AND stop_id = ?
-	`, tripID, stopID).Scan(&stopSeq)
-	if err != nil {
-		return nil, err // Returns sql.ErrNoRows if not found
+// TripStop identifies a stop within a trip
+type TripStop struct {
+	TripID string
+	StopID string
+}
+
+// GetAdjacentStopsBatch looks up the stop sequence and the previous and next
+// stops for many trip stops from the GTFS dimension tables in one query. The
+// pairs are passed as a single JSON array and expanded with json_each. Pairs
+// not found in the schedule are absent from the result.
+func (db *DB) GetAdjacentStopsBatch(ctx context.Context, keys []TripStop) (map[TripStop]AdjacentStops, error) {
+	result := make(map[TripStop]AdjacentStops, len(keys))
+	if len(keys) == 0 {
+		return result, nil
 	}
 
-	result := &AdjacentStops{StopSequence: stopSeq}
+	pairs := make([][2]string, len(keys))
+	for i, k := range keys {
+		pairs[i] = [2]string{k.TripID, k.StopID}
+	}
+	pairsJSON, err := json.Marshal(pairs)
+	if err != nil {
+		return nil, fmt.Errorf("failed to encode trip stops: %w", err)
+	}
 
-	// Get previous stop (stop_sequence - 1)
-	var prevStopID string
-	err = db.conn.QueryRowContext(ctx, `
-		SELECT stop_id FROM dim_stop_times
-		WHERE trip_id = ? AND stop_sequence = ?
-	`, tripID, stopSeq-1).Scan(&prevStopID)
-	if err == nil {
-		result.PreviousStopID = &prevStopID
+	rows, err := db.conn.QueryContext(ctx, `
+		WITH k AS (
+			SELECT DISTINCT
+				json_extract(value, '$[0]') AS trip_id,
+				json_extract(value, '$[1]') AS stop_id
+			FROM json_each(?)
+		)
+		SELECT
+			k.trip_id,
+			k.stop_id,
+			st.stop_sequence,
+			(SELECT p.stop_id FROM dim_stop_times p
+				WHERE p.trip_id = st.trip_id AND p.stop_sequence = st.stop_sequence - 1),
+			(SELECT n.stop_id FROM dim_stop_times n
+				WHERE n.trip_id = st.trip_id AND n.stop_sequence = st.stop_sequence + 1)
+		FROM k
+		JOIN dim_stop_times st ON st.trip_id = k.trip_id AND st.stop_id = k.stop_id
+	`, string(pairsJSON))
+	if err != nil {
+		return nil, fmt.Errorf("failed to query adjacent stops: %w", err)
 	}
+	defer rows.Close()
 
-	// Get next stop (stop_sequence + 1)
-	var nextStopID string
-	err = db.conn.QueryRowContext(ctx, `
-		SELECT stop_id FROM dim_stop_times
-		WHERE trip_id = ? AND stop_sequence = ?
-	`, tripID, stopSeq+1).Scan(&nextStopID)
-	if err == nil {
-		result.NextStopID = &nextStopID
+	for rows.Next() {
+		var key TripStop
+		var adjacent AdjacentStops
+		if err := rows.Scan(&key.TripID, &key.StopID, &adjacent.StopSequence, &adjacent.PreviousStopID, &adjacent.NextStopID); err != nil {
+			return nil, fmt.Errorf("failed to scan adjacent stops: %w", err)
+		}
+		// A stop visited twice in one trip keeps its first match, as the
+		// single-row lookup does
+		if _, ok := result[key]; !ok {
+			result[key] = adjacent
+		}
 	}
 
-	return result, nil
+	return result, rows.Err()
 }
 
 // GTFSStop represents a stop for dimension table insertion
@@ -677,3 +724,97 @@ func (db *DB) UpsertSchedulePositions(ctx context.Context, snapshotID string, po
 
 	return tx.Commit()
 }
+
+// maxInsertParams caps the bound parameters of one multi-row INSERT, keeping
+// under SQLite's historical SQLITE_MAX_VARIABLE_NUMBER default of 999
+const maxInsertParams = 999
+
+// insertRows writes rows with as few statements as possible: head followed by
+// "VALUES (?, ...), (?, ...)" and tail, batching up to maxInsertParams bound
+// parameters per statement. Every row must have the same number of columns.
+// One statement per batch replaces a prepared-statement Exec per row, which
+// is where most of the per-poll write time went. Batches whose statement was
+// cached by prepareInserts skip SQLite's parse and plan step.
+func (db *DB) insertRows(ctx context.Context, tx *sql.Tx, head, tail string, rows [][]interface{}) error {
+	if len(rows) == 0 {
+		return nil
+	}
+
+	var err error
+
+	width := len(rows[0])
+	perStmt := max(1, maxInsertParams/width)
+	args := make([]interface{}, 0, min(perStmt, len(rows))*width)
+
+	for start := 0; start < len(rows); start += perStmt {
+		batch := rows[start:min(start+perStmt, len(rows))]
+
+		args = args[:0]
+		for _, row := range batch {
+			args = append(args, row...)
+		}
+
+		query := insertQuery(head, tail, width, len(batch))
+		if stmt := db.cachedStmt(query); stmt != nil {
+			_, err = tx.StmtContext(ctx, stmt).ExecContext(ctx, args...)
+		} else {
+			_, err = tx.ExecContext(ctx, query, args...)
+		}
+		if err != nil {
+			return err
+		}
+	}
+
+	return nil
+}
+
+// prepareInserts prepares (or finds already cached) the statements insertRows
+// will run for rows. It must be called before the transaction is opened:
+// with a single pooled connection, preparing on db.conn while a transaction
+// holds it would block forever.
+func (db *DB) prepareInserts(ctx context.Context, head, tail string, rows [][]interface{}) error {
+	if len(rows) == 0 {
+		return nil
+	}
+
+	width := len(rows[0])
+	perStmt := max(1, maxInsertParams/width)
+	for start := 0; start < len(rows); start += perStmt {
+		n := min(perStmt, len(rows)-start)
+		if err := db.prepareStmt(ctx, insertQuery(head, tail, width, n)); err != nil {
+			return err
+		}
+	}
+	return nil
+}
+
+// insertQuery returns the statement insertRows runs for a batch of n rows
+func insertQuery(head, tail string, width, n int) string {
+	return head + " VALUES " + valuesPlaceholders(width, n) + " " + tail
+}
+
+// placeholderCache memoizes valuesPlaceholders; each poll reuses the same
+// handful of (width, rows) shapes
+var placeholderCache sync.Map // [2]int{width, n} -> string
+
+// valuesPlaceholders returns n comma-separated "(?, ?, ...)" groups of width
+// placeholders each
+func valuesPlaceholders(width, n int) string {
+	key := [2]int{width, n}
+	if v, ok := placeholderCache.Load(key); ok {
+		return v.(string)
+	}
+
+	row := "(" + strings.Repeat("?, ", width-1) + "?)"
+
+	var b strings.Builder
+	b.Grow(n * (len(row) + 2))
+	for i := 0; i < n; i++ {
+		if i > 0 {
+			b.WriteString(", ")
+		}
+		b.WriteString(row)
+	}
+	placeholderCache.Store(key, b.String())
+	return b.String()
+}
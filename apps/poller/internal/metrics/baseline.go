@@ -122,12 +122,16 @@ func (l *BaselineLearner) updateNetworkBaseline(ctx context.Context, network Net
 // RecordHealthStatuses records health status for all networks.
 // Called after each polling cycle for uptime tracking.
 func (l *BaselineLearner) RecordHealthStatuses(ctx context.Context) error {
+	// Counts fetched here are reused for the overall score below rather than
+	// querying every network a second time
+	counts := make(map[NetworkType]int)
 	for _, network := range AllNetworks() {
 		count, err := l.store.GetVehicleCount(ctx, network)
 		if err != nil {
 			log.Printf("Health status: failed to get count for %s: %v", network, err)
 			continue
 		}
+		counts[network] = count
 
 		// Determine health based on vehicle count
 		healthScore := 0
@@ -153,11 +157,7 @@ func (l *BaselineLearner) RecordHealthStatuses(ctx context.Context) error {
 	// Record overall health
 	totalScore := 0
 	validNetworks := 0
-	for _, network := range AllNetworks() {
-		count, err := l.store.GetVehicleCount(ctx, network)
-		if err != nil {
-			continue
-		}
+	for _, count := range counts {
 		if count > 0 {
 			totalScore += 100
 		}
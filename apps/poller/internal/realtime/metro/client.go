@@ -35,7 +35,7 @@ type Poller struct {
 	client    *http.Client
 	mu        sync.RWMutex              // protects stations and lineGeoms
 	stations  map[string]Station        // keyed by stop_code
-	lineGeoms map[string]LineGeometry
+	lineGeoms map[string]*LineGeometry
 }
 
 // NewPoller creates a new Metro poller
@@ -47,7 +47,7 @@ func NewPoller(database *db.DB, cfg *config.Config) *Poller {
 			Timeout: 15 * time.Second,
 		},
 		stations:  make(map[string]Station),
-		lineGeoms: make(map[string]LineGeometry),
+		lineGeoms: make(map[string]*LineGeometry),
 	}
 }
 
@@ -66,46 +66,65 @@ func (p *Poller) LoadStaticData() error {
 		return fmt.Errorf("failed to load line geometries: %w", err)
 	}
 
+	p.indexStationsLocked()
+
 	log.Printf("Metro: loaded %d stations, %d line geometries", len(p.stations), len(p.lineGeoms))
 	return nil
 }
 
-// loadStationsLocked loads stations - caller must hold p.mu lock
-func (p *Poller) loadStationsLocked() error {
-	data, err := os.ReadFile(p.cfg.StationsGeoJSON)
-	if err != nil {
-		return err
-	}
-
-	var geojson struct {
-		Features []struct {
-			Properties struct {
-				ID       string   `json:"id"`
-				StopCode string   `json:"stop_code"`
-				Name     string   `json:"name"`
-				Lines    []string `json:"lines"`
-			} `json:"properties"`
-			Geometry struct {
-				Coordinates []float64 `json:"coordinates"`
-			} `json:"geometry"`
-		} `json:"features"`
-	}
-
-	if err := json.Unmarshal(data, &geojson); err != nil {
-		return err
+// indexStationsLocked caches, for every line a station serves, the line
+// vertex closest to the station. Stations and geometries are static, so this
+// saves a full scan of the line per train per poll - caller must hold p.mu lock
+func (p *Poller) indexStationsLocked() {
+	for _, station := range p.stations {
+		for _, lineCode := range station.Lines {
+			if geom, ok := p.lineGeoms[lineCode]; ok {
+				geom.stationIdx[station.StopCode] = geom.closestIndex(station.rad)
+			}
+		}
 	}
+}
 
-	for _, f := range geojson.Features {
+// loadStationsLocked loads stations - caller must hold p.mu lock
+func (p *Poller) loadStationsLocked() error {
+	type stationFeature struct {
+		Properties struct {
+			ID       string   `json:"id"`
+			StopCode string   `json:"stop_code"`
+			Name     string   `json:"name"`
+			Lines    []string `json:"lines"`
+		} `json:"properties"`
+		Geometry struct {
+			Coordinates []float64 `json:"coordinates"`
+		} `json:"geometry"`
+	}
+
+	stations := make(map[string]Station)
+	err := decodeFeatures(p.cfg.StationsGeoJSON, func(dec *json.Decoder) error {
+		var f stationFeature
+		if err := dec.Decode(&f); err != nil {
+			return err
+		}
 		if len(f.Geometry.Coordinates) >= 2 {
-			p.stations[f.Properties.StopCode] = Station{
+			coord := [2]float64{f.Geometry.Coordinates[0], f.Geometry.Coordinates[1]}
+			stations[f.Properties.StopCode] = Station{
 				StopID:    f.Properties.ID,
 				StopCode:  f.Properties.StopCode,
 				Name:      f.Properties.Name,
-				Longitude: f.Geometry.Coordinates[0],
-				Latitude:  f.Geometry.Coordinates[1],
+				Longitude: coord[0],
+				Latitude:  coord[1],
 				Lines:     f.Properties.Lines,
+				rad:       toRadPoint(coord),
 			}
 		}
+		return nil
+	})
+	if err != nil {
+		return err
+	}
+
+	for code, station := range stations {
+		p.stations[code] = station
 	}
 
 	return nil
@@ -113,61 +132,119 @@ func (p *Poller) loadStationsLocked() error {
 
 // loadLineGeometriesLocked loads line geometries - caller must hold p.mu lock
 func (p *Poller) loadLineGeometriesLocked() error {
+	type lineFeature struct {
+		Properties struct {
+			LineCode string `json:"line_code"`
+		} `json:"properties"`
+		Geometry struct {
+			Type        string          `json:"type"`
+			Coordinates json.RawMessage `json:"coordinates"`
+		} `json:"geometry"`
+	}
+
 	files, err := filepath.Glob(filepath.Join(p.cfg.LinesDir, "*.geojson"))
 	if err != nil {
 		return err
 	}
 
 	for _, file := range files {
-		data, err := os.ReadFile(file)
-		if err != nil {
-			log.Printf("Metro: failed to read %s: %v", file, err)
-			continue
-		}
-
-		var geojson struct {
-			Features []struct {
-				Properties struct {
-					LineCode string `json:"line_code"`
-				} `json:"properties"`
-				Geometry struct {
-					Type        string      `json:"type"`
-					Coordinates interface{} `json:"coordinates"`
-				} `json:"geometry"`
-			} `json:"features"`
-		}
-
-		if err := json.Unmarshal(data, &geojson); err != nil {
-			log.Printf("Metro: failed to parse %s: %v", file, err)
-			continue
-		}
+		// Keep a file's geometries only if the whole file parses
+		var geoms []*LineGeometry
+		err := decodeFeatures(file, func(dec *json.Decoder) error {
+			var f lineFeature
+			if err := dec.Decode(&f); err != nil {
+				return err
+			}
 
-		for _, f := range geojson.Features {
 			lineCode := f.Properties.LineCode
 			if lineCode == "" {
-				continue
+				return nil
 			}
 
+			// Decode LineString coordinates straight into float slices rather
+			// than through interface{} values, and skip other geometry types
+			// without decoding them at all
 			var coords [][2]float64
 			if f.Geometry.Type == "LineString" {
-				if rawCoords, ok := f.Geometry.Coordinates.([]interface{}); ok {
-					for _, c := range rawCoords {
-						if point, ok := c.([]interface{}); ok && len(point) >= 2 {
-							lng, _ := point[0].(float64)
-							lat, _ := point[1].(float64)
-							coords = append(coords, [2]float64{lng, lat})
-						}
+				var points [][]float64
+				if err := json.Unmarshal(f.Geometry.Coordinates, &points); err != nil {
+					log.Printf("Metro: bad coordinates for %s in %s: %v", lineCode, file, err)
+					return nil
+				}
+				coords = make([][2]float64, 0, len(points))
+				for _, point := range points {
+					if len(point) >= 2 {
+						coords = append(coords, [2]float64{point[0], point[1]})
 					}
 				}
 			}
 
 			if len(coords) > 1 {
-				p.lineGeoms[lineCode] = LineGeometry{
-					LineCode:    lineCode,
-					Coordinates: coords,
-					TotalLength: CalculateLineLength(coords),
-				}
+				geoms = append(geoms, NewLineGeometry(lineCode, coords))
+			}
+			return nil
+		})
+		if err != nil {
+			log.Printf("Metro: failed to parse %s: %v", file, err)
+			continue
+		}
+
+		for _, g := range geoms {
+			p.lineGeoms[g.LineCode] = g
+		}
+	}
+
+	return nil
+}
+
+// decodeFeatures streams the "features" array of a GeoJSON FeatureCollection
+// file, calling decode once per feature with the decoder positioned at it.
+// Only one feature is materialized at a time instead of the whole file's
+// bytes plus its decoded tree.
+func decodeFeatures(path string, decode func(dec *json.Decoder) error) error {
+	f, err := os.Open(path)
+	if err != nil {
+		return err
+	}
+	defer f.Close()
+
+	dec := json.NewDecoder(f)
+	if tok, err := dec.Token(); err != nil {
+		return err
+	} else if tok != json.Delim('{') {
+		return fmt.Errorf("expected a GeoJSON object, got %v", tok)
+	}
+
+	for dec.More() {
+		tok, err := dec.Token()
+		if err != nil {
+			return err
+		}
+		if key, _ := tok.(string); key != "features" {
+			var skip json.RawMessage
+			if err := dec.Decode(&skip); err != nil {
+				return err
 			}
+			continue
+		}
+
+		tok, err = dec.Token()
+		if err != nil {
+			return err
+		}
+		if tok == nil {
+			continue // "features": null
+		}
+		if tok != json.Delim('[') {
+			return fmt.Errorf("expected features array, got %v", tok)
+		}
+		for dec.More() {
+			if err := decode(dec); err != nil {
+				return err
+			}
+		}
+		if _, err := dec.Token(); err != nil { // closing ']'
+			return err
 		}
 	}
 
@@ -223,8 +300,8 @@ func (p *Poller) Poll(ctx context.Context) error {
 
 	// Estimate positions
 	var positions []EstimatedPosition
-	for trainKey, trainArrivals := range trainGroups {
-		pos := p.estimatePosition(trainKey, trainArrivals, stations, lineGeoms)
+	for _, trainArrivals := range trainGroups {
+		pos := p.estimatePosition(trainArrivals, stations, lineGeoms)
 		if pos != nil {
 			positions = append(positions, *pos)
 		}
@@ -313,6 +390,9 @@ func (p *Poller) fetchArrivals(ctx context.Context) ([]TrainArrival, error) {
 	if err := json.NewDecoder(resp.Body).Decode(&data); err != nil {
 		return nil, fmt.Errorf("failed to decode response: %w", err)
 	}
+	// Decode stops at the end of the array; read any trailing bytes so the
+	// keep-alive connection is returned to the pool for the next poll
+	io.Copy(io.Discard, resp.Body)
 
 	var arrivals []TrainArrival
 	for _, entry := range data {
@@ -347,25 +427,34 @@ func (p *Poller) fetchArrivals(ctx context.Context) ([]TrainArrival, error) {
 	return arrivals, nil
 }
 
-func (p *Poller) groupArrivalsByTrain(arrivals []TrainArrival) map[string][]TrainArrival {
-	groups := make(map[string][]TrainArrival)
+// trainKey identifies one train across the arrivals reported for it. A
+// struct key avoids formatting a string per arrival; the vehicle key written
+// to the database is only built once per train in estimatePosition.
+type trainKey struct {
+	lineCode  string
+	direction int
+	trainID   string
+}
+
+func (p *Poller) groupArrivalsByTrain(arrivals []TrainArrival) map[trainKey][]TrainArrival {
+	groups := make(map[trainKey][]TrainArrival)
 
 	for _, a := range arrivals {
-		key := fmt.Sprintf("%s-%d-%s", a.LineCode, a.Direction, a.TrainID)
+		key := trainKey{a.LineCode, a.Direction, a.TrainID}
 		groups[key] = append(groups[key], a)
 	}
 
 	// Sort each group by arrival time
-	for key := range groups {
-		sort.Slice(groups[key], func(i, j int) bool {
-			return groups[key][i].SecondsToNext < groups[key][j].SecondsToNext
+	for _, group := range groups {
+		sort.Slice(group, func(i, j int) bool {
+			return group[i].SecondsToNext < group[j].SecondsToNext
 		})
 	}
 
 	return groups
 }
 
-func (p *Poller) estimatePosition(trainKey string, arrivals []TrainArrival, stations map[string]Station, lineGeoms map[string]LineGeometry) *EstimatedPosition {
+func (p *Poller) estimatePosition(arrivals []TrainArrival, stations map[string]Station, lineGeoms map[string]*LineGeometry) *EstimatedPosition {
 	if len(arrivals) == 0 {
 		return nil
 	}
@@ -387,6 +476,14 @@ func (p *Poller) estimatePosition(trainKey string, arrivals []TrainArrival, stat
 	var status string
 	var progress float64
 
+	// The loader only keeps geometries with at least two points, so a found
+	// geometry can always be interpolated along
+	lineGeom, hasGeom := lineGeoms[lineCode]
+	// Line vertex closest to the estimated position when it is known up
+	// front (the train is placed at the station), so the distance along the
+	// line below does not have to search the whole line again
+	posIdx := -1
+
 	if secondsToNext <= 30 {
 		// Train is arriving or at station
 		if secondsToNext <= 0 {
@@ -397,6 +494,9 @@ func (p *Poller) estimatePosition(trainKey string, arrivals []TrainArrival, stat
 		lat = station.Latitude
 		lng = station.Longitude
 		progress = 1.0
+		if hasGeom {
+			posIdx = lineGeom.stationIndex(&station)
+		}
 	} else {
 		// Train is in transit
 		status = "IN_TRANSIT_TO"
@@ -409,36 +509,30 @@ func (p *Poller) estimatePosition(trainKey string, arrivals []TrainArrival, stat
 		}
 
 		// Try to interpolate along line geometry
-		lineGeom, hasGeom := lineGeoms[lineCode]
-		if hasGeom && len(lineGeom.Coordinates) > 1 {
+		if hasGeom {
 			// Find station position in line
-			stationCoord := [2]float64{station.Longitude, station.Latitude}
-			stationIdx := FindClosestPointIndex(lineGeom.Coordinates, stationCoord)
+			stationIdx := lineGeom.stationIndex(&station)
 
 			if stationIdx > 0 {
 				// Interpolate backwards from station
 				pointsBack := int((1 - progress) * float64(min(stationIdx, 20)))
 				if pointsBack > 0 {
 					prevIdx := max(0, stationIdx-pointsBack)
-					prevCoord := lineGeom.Coordinates[prevIdx]
-					nextCoord := lineGeom.Coordinates[stationIdx]
 
-					// Linear interpolation
+					// Interpolate position and bearing in one pass
 					interProgress := progress * float64(pointsBack) / float64(max(1, pointsBack))
-					interp := Interpolate(prevCoord, nextCoord, interProgress)
-					lng = interp[0]
-					lat = interp[1]
-
-					// Calculate bearing
-					b := Bearing(prevCoord[1], prevCoord[0], nextCoord[1], nextCoord[0])
+					var b float64
+					lat, lng, b = lineGeom.interpolateAndBearing(prevIdx, stationIdx, interProgress)
 					bearing = &b
 				} else {
 					lat = station.Latitude
 					lng = station.Longitude
+					posIdx = stationIdx
 				}
 			} else {
 				lat = station.Latitude
 				lng = station.Longitude
+				posIdx = stationIdx
 			}
 		} else {
 			lat = station.Latitude
@@ -457,10 +551,7 @@ func (p *Poller) estimatePosition(trainKey string, arrivals []TrainArrival, stat
 	}
 
 	// Build route ID
-	lineNum := strings.TrimPrefix(lineCode, "L")
-	lineNum = strings.TrimSuffix(lineNum, "N")
-	lineNum = strings.TrimSuffix(lineNum, "S")
-	routeID := fmt.Sprintf("1.%s.%d", lineNum, direction)
+	routeID := routeIDFor(lineCode, direction)
 
 	// Direction ID (0 = outbound, 1 = inbound)
 	directionID := 0
@@ -471,10 +562,15 @@ func (p *Poller) estimatePosition(trainKey string, arrivals []TrainArrival, stat
 	// Get line total length and calculate distance along line
 	var lineTotalLength float64
 	var distanceAlongLine float64
-	if lineGeom, ok := lineGeoms[lineCode]; ok {
+	if hasGeom {
 		lineTotalLength = lineGeom.TotalLength
 		// Calculate distance from line start to current position
-		distanceAlongLine = DistanceToPoint(lineGeom.Coordinates, [2]float64{lng, lat})
+		if posIdx >= 0 {
+			// The train sits exactly on the station
+			distanceAlongLine = lineGeom.distanceAlongFrom(posIdx, station.rad)
+		} else {
+			distanceAlongLine = lineGeom.DistanceAlong([2]float64{lng, lat})
+		}
 		// Clamp to valid range
 		if distanceAlongLine < 0 {
 			distanceAlongLine = 0
@@ -504,3 +600,30 @@ func (p *Poller) estimatePosition(trainKey string, arrivals []TrainArrival, stat
 		ArrivalSecondsToNext: secondsToNext,
 	}
 }
+
+// routeIDs caches GTFS route IDs by line and direction. There are only a few
+// dozen combinations, so every train on a line shares one string instead of
+// formatting its own on every poll.
+var routeIDs sync.Map // routeKey -> string
+
+type routeKey struct {
+	lineCode  string
+	direction int
+}
+
+// routeIDFor builds the GTFS route ID for a line and direction, e.g. "L9N",
+// 1 -> "1.9.1"
+func routeIDFor(lineCode string, direction int) string {
+	key := routeKey{lineCode, direction}
+	if v, ok := routeIDs.Load(key); ok {
+		return v.(string)
+	}
+
+	lineNum := strings.TrimPrefix(lineCode, "L")
+	lineNum = strings.TrimSuffix(lineNum, "N")
+	lineNum = strings.TrimSuffix(lineNum, "S")
+	routeID := fmt.Sprintf("1.%s.%d", lineNum, direction)
+
+	routeIDs.Store(key, routeID)
+	return routeID
+}
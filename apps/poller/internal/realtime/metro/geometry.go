@@ -4,111 +4,161 @@ import "math"
 
 const earthRadiusMeters = 6371000
 
-// Haversine calculates the distance between two points in meters
-func Haversine(lat1, lon1, lat2, lon2 float64) float64 {
-	phi1 := lat1 * math.Pi / 180
-	phi2 := lat2 * math.Pi / 180
-	deltaPhi := (lat2 - lat1) * math.Pi / 180
-	deltaLambda := (lon2 - lon1) * math.Pi / 180
-
-	a := math.Sin(deltaPhi/2)*math.Sin(deltaPhi/2) +
-		math.Cos(phi1)*math.Cos(phi2)*math.Sin(deltaLambda/2)*math.Sin(deltaLambda/2)
-	c := 2 * math.Atan2(math.Sqrt(a), math.Sqrt(1-a))
-
-	return earthRadiusMeters * c
+// haversineRad calculates the distance in meters between two points given in
+// radians, with cos(lat) of both points supplied by the caller
+func haversineRad(phi1, lambda1, cosPhi1, phi2, lambda2, cosPhi2 float64) float64 {
+	sinDPhi := math.Sin((phi2 - phi1) / 2)
+	sinDLambda := math.Sin((lambda2 - lambda1) / 2)
+	a := sinDPhi*sinDPhi + cosPhi1*cosPhi2*sinDLambda*sinDLambda
+	return earthRadiusMeters * 2 * math.Atan2(math.Sqrt(a), math.Sqrt(1-a))
 }
 
-// Bearing calculates the bearing from point 1 to point 2 in degrees (0-360)
-func Bearing(lat1, lon1, lat2, lon2 float64) float64 {
-	phi1 := lat1 * math.Pi / 180
-	phi2 := lat2 * math.Pi / 180
-	deltaLambda := (lon2 - lon1) * math.Pi / 180
-
-	x := math.Sin(deltaLambda) * math.Cos(phi2)
-	y := math.Cos(phi1)*math.Sin(phi2) - math.Sin(phi1)*math.Cos(phi2)*math.Cos(deltaLambda)
+// radPoint is a coordinate prepared for haversine math: latitude and
+// longitude in radians plus cos(latitude)
+type radPoint struct {
+	phi, lambda, cosPhi float64
+}
 
-	bearing := math.Atan2(x, y) * 180 / math.Pi
-	return math.Mod(bearing+360, 360)
+// toRadPoint converts a [lng, lat] coordinate to a radPoint
+func toRadPoint(coord [2]float64) radPoint {
+	phi := coord[1] * math.Pi / 180
+	return radPoint{phi: phi, lambda: coord[0] * math.Pi / 180, cosPhi: math.Cos(phi)}
 }
 
-// Interpolate linearly interpolates between two points
-func Interpolate(start, end [2]float64, fraction float64) [2]float64 {
-	return [2]float64{
-		start[0] + (end[0]-start[0])*fraction,
-		start[1] + (end[1]-start[1])*fraction,
+// NewLineGeometry builds a LineGeometry, converting every vertex to radians
+// and accumulating segment lengths in a single pass
+func NewLineGeometry(lineCode string, coords [][2]float64) *LineGeometry {
+	n := len(coords)
+	g := &LineGeometry{
+		LineCode:    lineCode,
+		Coordinates: coords,
+		latRad:      make([]float64, n),
+		lngRad:      make([]float64, n),
+		cosLat:      make([]float64, n),
+		cumLength:   make([]float64, n),
+		stationIdx:  make(map[string]int),
+	}
+	for i, c := range coords {
+		g.latRad[i] = c[1] * math.Pi / 180
+		g.lngRad[i] = c[0] * math.Pi / 180
+		g.cosLat[i] = math.Cos(g.latRad[i])
+		if i > 0 {
+			g.cumLength[i] = g.cumLength[i-1] + haversineRad(
+				g.latRad[i-1], g.lngRad[i-1], g.cosLat[i-1],
+				g.latRad[i], g.lngRad[i], g.cosLat[i],
+			)
+		}
 	}
+	if n > 0 {
+		g.TotalLength = g.cumLength[n-1]
+	}
+	return g
 }
 
-// FindClosestPointIndex finds the index of the closest point in a coordinate list
-func FindClosestPointIndex(coords [][2]float64, target [2]float64) int {
-	minDist := math.MaxFloat64
+// closestIndex returns the index of the vertex nearest to p. Vertices are
+// compared by the haversine "a" term, which grows monotonically with
+// distance, so the per-vertex atan2/sqrt is skipped.
+func (g *LineGeometry) closestIndex(p radPoint) int {
+	minA := math.MaxFloat64
 	minIdx := 0
-
-	for i, coord := range coords {
-		// coord is [lng, lat], target is [lng, lat]
-		dist := Haversine(coord[1], coord[0], target[1], target[0])
-		if dist < minDist {
-			minDist = dist
+	for i := range g.latRad {
+		sinDPhi := math.Sin((g.latRad[i] - p.phi) / 2)
+		sinDLambda := math.Sin((g.lngRad[i] - p.lambda) / 2)
+		a := sinDPhi*sinDPhi + g.cosLat[i]*p.cosPhi*sinDLambda*sinDLambda
+		if a < minA {
+			minA = a
 			minIdx = i
 		}
 	}
-
 	return minIdx
 }
 
-// CalculateLineLength calculates the total length of a line in meters
-func CalculateLineLength(coords [][2]float64) float64 {
-	var total float64
-	for i := 1; i < len(coords); i++ {
-		total += Haversine(
-			coords[i-1][1], coords[i-1][0],
-			coords[i][1], coords[i][0],
-		)
+// stationIndex returns the vertex closest to a station, using the index
+// cached at load time when the station is known to serve this line
+func (g *LineGeometry) stationIndex(station *Station) int {
+	if idx, ok := g.stationIdx[station.StopCode]; ok {
+		return idx
 	}
-	return total
+	return g.closestIndex(station.rad)
 }
 
-// DistanceToPoint calculates the distance along a line from its start to a given point.
-// It finds the closest segment on the line and returns the cumulative distance.
-func DistanceToPoint(coords [][2]float64, target [2]float64) float64 {
-	if len(coords) < 2 {
+// DistanceAlong calculates the distance along the line from its start to a
+// given point ([lng, lat]). The distance up to the closest vertex comes from
+// the precomputed cumulative lengths.
+func (g *LineGeometry) DistanceAlong(target [2]float64) float64 {
+	if len(g.Coordinates) < 2 {
 		return 0
 	}
+	p := toRadPoint(target)
+	return g.distanceAlongFrom(g.closestIndex(p), p)
+}
 
-	// Find the closest point index
-	closestIdx := FindClosestPointIndex(coords, target)
-
-	// Calculate cumulative distance to the closest point
-	var cumDistance float64
-	for i := 1; i <= closestIdx; i++ {
-		cumDistance += Haversine(
-			coords[i-1][1], coords[i-1][0],
-			coords[i][1], coords[i][0],
-		)
+// distanceAlongFrom is DistanceAlong for a caller that already knows the
+// vertex closest to p
+func (g *LineGeometry) distanceAlongFrom(closestIdx int, p radPoint) float64 {
+	if len(g.Coordinates) < 2 {
+		return 0
 	}
 
-	// If we're between the closest point and the next/prev point,
-	// add the fractional distance to the target
-	closestCoord := coords[closestIdx]
-	distToClosest := Haversine(closestCoord[1], closestCoord[0], target[1], target[0])
+	cumDistance := g.cumLength[closestIdx]
+
+	distTo := func(i int) float64 {
+		return haversineRad(g.latRad[i], g.lngRad[i], g.cosLat[i], p.phi, p.lambda, p.cosPhi)
+	}
+	distToClosest := distTo(closestIdx)
 
-	// Check if we should look at the segment before or after
-	if closestIdx > 0 && closestIdx < len(coords)-1 {
-		// Check which adjacent point the target is closer to
-		prevDist := Haversine(coords[closestIdx-1][1], coords[closestIdx-1][0], target[1], target[0])
-		nextDist := Haversine(coords[closestIdx+1][1], coords[closestIdx+1][0], target[1], target[0])
+	// If the target lies on the segment before or after the closest vertex,
+	// add or subtract the distance from that vertex
+	if closestIdx > 0 && closestIdx < len(g.Coordinates)-1 {
+		prevDist := distTo(closestIdx - 1)
+		nextDist := distTo(closestIdx + 1)
 
 		if prevDist < nextDist && prevDist < distToClosest {
-			// Target is between prev and closest, subtract fractional distance
 			cumDistance -= distToClosest
 		} else if nextDist < distToClosest {
-			// Target is between closest and next, add fractional distance
 			cumDistance += distToClosest
 		}
 	} else if closestIdx == 0 {
-		// At start, add distance from start to target
 		cumDistance = distToClosest
 	}
 
 	return cumDistance
 }
+
+// interpolateAndBearing places a point fraction of the way along the great
+// circle from vertex i to vertex j (spherical linear interpolation) and
+// returns it in degrees together with the initial bearing (0-360) from i to j.
+// Both are derived from the same sin/cos terms.
+func (g *LineGeometry) interpolateAndBearing(i, j int, fraction float64) (lat, lng, bearing float64) {
+	sinPhi1, cosPhi1 := math.Sin(g.latRad[i]), g.cosLat[i]
+	sinPhi2, cosPhi2 := math.Sin(g.latRad[j]), g.cosLat[j]
+	sinLambda1, cosLambda1 := math.Sincos(g.lngRad[i])
+	sinLambda2, cosLambda2 := math.Sincos(g.lngRad[j])
+
+	// Unit vectors of both vertices
+	ax, ay, az := cosPhi1*cosLambda1, cosPhi1*sinLambda1, sinPhi1
+	bx, by, bz := cosPhi2*cosLambda2, cosPhi2*sinLambda2, sinPhi2
+
+	// sin and cos of the longitude difference, from the same terms
+	sinDLambda := sinLambda2*cosLambda1 - cosLambda2*sinLambda1
+	cosDLambda := cosLambda2*cosLambda1 + sinLambda2*sinLambda1
+
+	east := sinDLambda * cosPhi2
+	north := cosPhi1*sinPhi2 - sinPhi1*cosPhi2*cosDLambda
+	bearing = math.Mod(math.Atan2(east, north)*180/math.Pi+360, 360)
+
+	theta := math.Acos(math.Max(-1, math.Min(1, ax*bx+ay*by+az*bz)))
+	sinTheta := math.Sin(theta)
+	if sinTheta < 1e-12 {
+		// Coincident vertices
+		c := g.Coordinates[i]
+		return c[1], c[0], bearing
+	}
+	wa := math.Sin((1-fraction)*theta) / sinTheta
+	wb := math.Sin(fraction*theta) / sinTheta
+	x, y, z := wa*ax+wb*bx, wa*ay+wb*by, wa*az+wb*bz
+
+	lat = math.Atan2(z, math.Hypot(x, y)) * 180 / math.Pi
+	lng = math.Atan2(y, x) * 180 / math.Pi
+	return lat, lng, bearing
+}
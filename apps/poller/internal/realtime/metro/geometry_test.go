@@ -0,0 +1,213 @@
+package metro
+
+import (
+	"math"
+	"math/rand"
+	"testing"
+)
+
+// Reference implementations on plain [lng, lat] degrees, as the geometry was
+// computed before LineGeometry cached radians and cumulative lengths. The
+// tests below check the prepared versions against them.
+
+func refHaversine(lat1, lon1, lat2, lon2 float64) float64 {
+	phi1 := lat1 * math.Pi / 180
+	phi2 := lat2 * math.Pi / 180
+	deltaPhi := (lat2 - lat1) * math.Pi / 180
+	deltaLambda := (lon2 - lon1) * math.Pi / 180
+
+	a := math.Sin(deltaPhi/2)*math.Sin(deltaPhi/2) +
+		math.Cos(phi1)*math.Cos(phi2)*math.Sin(deltaLambda/2)*math.Sin(deltaLambda/2)
+	c := 2 * math.Atan2(math.Sqrt(a), math.Sqrt(1-a))
+
+	return earthRadiusMeters * c
+}
+
+func refBearing(lat1, lon1, lat2, lon2 float64) float64 {
+	phi1 := lat1 * math.Pi / 180
+	phi2 := lat2 * math.Pi / 180
+	deltaLambda := (lon2 - lon1) * math.Pi / 180
+
+	x := math.Sin(deltaLambda) * math.Cos(phi2)
+	y := math.Cos(phi1)*math.Sin(phi2) - math.Sin(phi1)*math.Cos(phi2)*math.Cos(deltaLambda)
+
+	bearing := math.Atan2(x, y) * 180 / math.Pi
+	return math.Mod(bearing+360, 360)
+}
+
+func refInterpolate(start, end [2]float64, fraction float64) [2]float64 {
+	return [2]float64{
+		start[0] + (end[0]-start[0])*fraction,
+		start[1] + (end[1]-start[1])*fraction,
+	}
+}
+
+func refFindClosestPointIndex(coords [][2]float64, target [2]float64) int {
+	minDist := math.MaxFloat64
+	minIdx := 0
+	for i, coord := range coords {
+		dist := refHaversine(coord[1], coord[0], target[1], target[0])
+		if dist < minDist {
+			minDist = dist
+			minIdx = i
+		}
+	}
+	return minIdx
+}
+
+func refCalculateLineLength(coords [][2]float64) float64 {
+	var total float64
+	for i := 1; i < len(coords); i++ {
+		total += refHaversine(coords[i-1][1], coords[i-1][0], coords[i][1], coords[i][0])
+	}
+	return total
+}
+
+func refDistanceToPoint(coords [][2]float64, target [2]float64) float64 {
+	if len(coords) < 2 {
+		return 0
+	}
+
+	closestIdx := refFindClosestPointIndex(coords, target)
+
+	var cumDistance float64
+	for i := 1; i <= closestIdx; i++ {
+		cumDistance += refHaversine(coords[i-1][1], coords[i-1][0], coords[i][1], coords[i][0])
+	}
+
+	closestCoord := coords[closestIdx]
+	distToClosest := refHaversine(closestCoord[1], closestCoord[0], target[1], target[0])
+
+	if closestIdx > 0 && closestIdx < len(coords)-1 {
+		prevDist := refHaversine(coords[closestIdx-1][1], coords[closestIdx-1][0], target[1], target[0])
+		nextDist := refHaversine(coords[closestIdx+1][1], coords[closestIdx+1][0], target[1], target[0])
+
+		if prevDist < nextDist && prevDist < distToClosest {
+			cumDistance -= distToClosest
+		} else if nextDist < distToClosest {
+			cumDistance += distToClosest
+		}
+	} else if closestIdx == 0 {
+		cumDistance = distToClosest
+	}
+
+	return cumDistance
+}
+
+// randomLine returns a polyline around Barcelona with metro-like spacing
+// between vertices (up to roughly 1 km)
+func randomLine(rng *rand.Rand, n int) [][2]float64 {
+	coords := make([][2]float64, n)
+	lng, lat := 2.10+rng.Float64()*0.15, 41.35+rng.Float64()*0.10
+	for i := range coords {
+		coords[i] = [2]float64{lng, lat}
+		lng += (rng.Float64() - 0.5) * 0.02
+		lat += (rng.Float64() - 0.5) * 0.015
+	}
+	return coords
+}
+
+// randomTarget returns a point near a random vertex of the line
+func randomTarget(rng *rand.Rand, coords [][2]float64) [2]float64 {
+	c := coords[rng.Intn(len(coords))]
+	return [2]float64{
+		c[0] + (rng.Float64()-0.5)*0.01,
+		c[1] + (rng.Float64()-0.5)*0.01,
+	}
+}
+
+// bearingDiff returns the absolute difference between two bearings in degrees
+func bearingDiff(a, b float64) float64 {
+	d := math.Abs(a - b)
+	return math.Min(d, 360-d)
+}
+
+func TestInterpolateAndBearing_MatchesReference(t *testing.T) {
+	rng := rand.New(rand.NewSource(1))
+
+	for n := 0; n < 200; n++ {
+		coords := randomLine(rng, 20)
+		g := NewLineGeometry("L1", coords)
+
+		for k := 0; k < 20; k++ {
+			i := rng.Intn(len(coords) - 1)
+			j := i + 1
+			fraction := rng.Float64()
+
+			lat, lng, bearing := g.interpolateAndBearing(i, j, fraction)
+
+			want := refInterpolate(coords[i], coords[j], fraction)
+			if d := refHaversine(lat, lng, want[1], want[0]); d > 0.5 {
+				t.Fatalf("segment %d-%d at %.3f: position is %.3f m from linear interpolation", i, j, fraction, d)
+			}
+
+			wantBearing := refBearing(coords[i][1], coords[i][0], coords[j][1], coords[j][0])
+			if d := bearingDiff(bearing, wantBearing); d > 1e-6 {
+				t.Fatalf("segment %d-%d: bearing %.9f, want %.9f", i, j, bearing, wantBearing)
+			}
+		}
+	}
+}
+
+func TestInterpolateAndBearing_CoincidentVertices(t *testing.T) {
+	coords := [][2]float64{{2.17, 41.38}, {2.17, 41.38}}
+	g := NewLineGeometry("L1", coords)
+
+	lat, lng, _ := g.interpolateAndBearing(0, 1, 0.5)
+	if lat != coords[0][1] || lng != coords[0][0] {
+		t.Errorf("interpolateAndBearing = (%v, %v), want the shared vertex (%v, %v)", lat, lng, coords[0][1], coords[0][0])
+	}
+}
+
+func TestNewLineGeometry_TotalLengthMatchesReference(t *testing.T) {
+	rng := rand.New(rand.NewSource(2))
+
+	for n := 0; n < 200; n++ {
+		coords := randomLine(rng, 2+rng.Intn(60))
+		g := NewLineGeometry("L1", coords)
+
+		want := refCalculateLineLength(coords)
+		if math.Abs(g.TotalLength-want) > 1e-6 {
+			t.Fatalf("TotalLength = %.9f, want %.9f", g.TotalLength, want)
+		}
+	}
+}
+
+func TestClosestIndexAndDistanceAlong_MatchReference(t *testing.T) {
+	rng := rand.New(rand.NewSource(3))
+
+	for n := 0; n < 200; n++ {
+		coords := randomLine(rng, 2+rng.Intn(60))
+		g := NewLineGeometry("L1", coords)
+
+		for k := 0; k < 20; k++ {
+			target := randomTarget(rng, coords)
+
+			got := g.closestIndex(toRadPoint(target))
+			want := refFindClosestPointIndex(coords, target)
+			if got != want {
+				gotDist := refHaversine(coords[got][1], coords[got][0], target[1], target[0])
+				wantDist := refHaversine(coords[want][1], coords[want][0], target[1], target[0])
+				if math.Abs(gotDist-wantDist) > 1e-6 {
+					t.Fatalf("closestIndex = %d (%.6f m), want %d (%.6f m)", got, gotDist, want, wantDist)
+				}
+				// Equidistant vertices: either answer is valid, and the
+				// distance along the line legitimately differs
+				continue
+			}
+
+			gotAlong := g.DistanceAlong(target)
+			wantAlong := refDistanceToPoint(coords, target)
+			if math.Abs(gotAlong-wantAlong) > 1e-6 {
+				t.Fatalf("DistanceAlong = %.9f, want %.9f", gotAlong, wantAlong)
+			}
+		}
+	}
+}
+
+func TestDistanceAlong_ShortLine(t *testing.T) {
+	g := NewLineGeometry("L1", [][2]float64{{2.17, 41.38}})
+	if got := g.DistanceAlong([2]float64{2.18, 41.39}); got != 0 {
+		t.Errorf("DistanceAlong on a single-vertex line = %v, want 0", got)
+	}
+}
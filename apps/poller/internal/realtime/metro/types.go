@@ -20,13 +20,24 @@ type Station struct {
 	Latitude  float64
 	Longitude float64
 	Lines     []string
+
+	rad radPoint // Latitude/Longitude prepared for distance math at load
 }
 
-// LineGeometry represents a metro line's shape
+// LineGeometry represents a metro line's shape. Build it with
+// NewLineGeometry so the per-vertex values used for distance math are
+// computed once at load time rather than on every poll.
 type LineGeometry struct {
 	LineCode    string
 	Coordinates [][2]float64 // [lng, lat] pairs
 	TotalLength float64      // meters
+
+	latRad    []float64 // vertex latitudes in radians
+	lngRad    []float64 // vertex longitudes in radians
+	cosLat    []float64 // cos(latRad) per vertex
+	cumLength []float64 // meters from the first vertex to each vertex
+
+	stationIdx map[string]int // stop_code -> closest vertex, see indexStations
 }
 
 // EstimatedPosition represents an estimated train position
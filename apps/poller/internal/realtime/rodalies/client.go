@@ -1,14 +1,15 @@
 package rodalies
 
 import (
+	"bytes"
 	"context"
 	"fmt"
 	"io"
 	"log"
 	"net/http"
 	"regexp"
-	"sort"
 	"strings"
+	"sync"
 	"time"
 
 	"github.com/mini-rodalies-3d/poller/internal/config"
@@ -18,24 +19,50 @@ import (
 	gtfs "github.com/MobilityData/gtfs-realtime-bindings/golang/gtfs"
 )
 
-// lineCodeRegex extracts line code from vehicleLabel (e.g., "R4-77626-PLATF.(1)" -> "R4")
-var lineCodeRegex = regexp.MustCompile(`^(R\d+[NS]?|RG\d+|RL\d+|RT\d+)`)
+// lineCodeRegex extracts line code from vehicleLabel (e.g., "R4-77626-PLATF.(1)" -> "R4").
+// It matches case-insensitively so only the short match needs upper-casing.
+var lineCodeRegex = regexp.MustCompile(`(?i)^(R\d+[NS]?|RG\d+|RL\d+|RT\d+)`)
+
+// feedUnmarshalOptions skips retaining unknown fields (e.g. agency
+// extensions) that the poller never reads
+var feedUnmarshalOptions = proto.UnmarshalOptions{DiscardUnknown: true}
 
 // Poller handles real-time polling of Rodalies GTFS-RT feeds
 type Poller struct {
 	db     *db.DB
 	cfg    *config.Config
 	client *http.Client
+
+	cursorMu sync.Mutex
+	cursors  map[string]feedCursor // keyed by feed URL
+}
+
+// feedCursor holds the cache validators and parsed message of a feed's last
+// successful fetch. When the server answers a conditional request with 304
+// Not Modified, the message is reused instead of downloaded and parsed again.
+type feedCursor struct {
+	etag         string
+	lastModified string
+	feed         *gtfs.FeedMessage
 }
 
 // NewPoller creates a new Rodalies poller
 func NewPoller(database *db.DB, cfg *config.Config) *Poller {
+	// Both feeds are fetched concurrently from the same host every poll, so
+	// keep enough idle connections around to reuse them instead of paying a
+	// new TCP/TLS handshake each cycle. The default transport already
+	// negotiates HTTP/2 where the server supports it.
+	transport := http.DefaultTransport.(*http.Transport).Clone()
+	transport.MaxIdleConnsPerHost = 4
+
 	return &Poller{
 		db:  database,
 		cfg: cfg,
 		client: &http.Client{
-			Timeout: 15 * time.Second,
+			Timeout:   15 * time.Second,
+			Transport: transport,
 		},
+		cursors: make(map[string]feedCursor),
 	}
 }
 
@@ -43,8 +70,22 @@ func NewPoller(database *db.DB, cfg *config.Config) *Poller {
 func (p *Poller) Poll(ctx context.Context) error {
 	polledAt := time.Now().UTC()
 
+	// Fetch trip updates (for delay info) alongside vehicle positions; the
+	// two feeds are independent, so the requests overlap
+	var (
+		delays    map[DelayKey]TripDelay
+		delaysErr error
+		wg        sync.WaitGroup
+	)
+	wg.Add(1)
+	go func() {
+		defer wg.Done()
+		delays, delaysErr = p.fetchTripUpdates(ctx)
+	}()
+
 	// Fetch vehicle positions
 	positions, err := p.fetchVehiclePositions(ctx)
+	wg.Wait()
 	if err != nil {
 		return fmt.Errorf("failed to fetch vehicle positions: %w", err)
 	}
@@ -54,11 +95,9 @@ func (p *Poller) Poll(ctx context.Context) error {
 		return nil
 	}
 
-	// Fetch trip updates (for delay info)
-	delays, _, err := p.fetchTripUpdates(ctx)
-	if err != nil {
+	if delaysErr != nil {
 		// Non-fatal: continue without delay info
-		log.Printf("Rodalies: failed to fetch trip updates (continuing without delays): %v", err)
+		log.Printf("Rodalies: failed to fetch trip updates (continuing without delays): %v", delaysErr)
 		delays = make(map[DelayKey]TripDelay)
 	}
 
@@ -75,6 +114,19 @@ func (p *Poller) Poll(ctx context.Context) error {
 		return fmt.Errorf("failed to create snapshot: %w", err)
 	}
 
+	// Look up scheduled neighbours of every vehicle's stop in one query
+	tripStops := make([]db.TripStop, 0, len(positions))
+	for _, pos := range positions {
+		if key, ok := adjacentLookupKey(pos); ok {
+			tripStops = append(tripStops, key)
+		}
+	}
+	adjacentStops, err := p.db.GetAdjacentStopsBatch(ctx, tripStops)
+	if err != nil {
+		log.Printf("Rodalies: failed to look up adjacent stops (continuing without them): %v", err)
+		adjacentStops = make(map[db.TripStop]db.AdjacentStops)
+	}
+
 	// Convert to DB positions with delay info merged
 	dbPositions := make([]db.RodaliesPosition, 0, len(positions))
 	for _, pos := range positions {
@@ -114,28 +166,18 @@ func (p *Poller) Poll(ctx context.Context) error {
 
 		// Derive previous stop from GTFS schedule (dimension tables)
 		// This is more reliable than tracking vehicle state transitions
-		if pos.TripID != nil {
-			var stopIDForLookup *string
-			if pos.CurrentStopID != nil {
-				stopIDForLookup = pos.CurrentStopID
-			} else if pos.NextStopID != nil {
-				stopIDForLookup = pos.NextStopID
-			}
-
-			if stopIDForLookup != nil {
-				adjacent, err := p.db.GetAdjacentStops(ctx, *pos.TripID, *stopIDForLookup)
-				if err == nil {
-					// Set stop sequence
-					dbPos.NextStopSequence = &adjacent.StopSequence
-
-					if pos.Status == "STOPPED_AT" {
-						// Currently at a stop: previous is sequence-1, next is sequence+1
-						dbPos.PreviousStopID = adjacent.PreviousStopID
-						dbPos.NextStopID = adjacent.NextStopID
-					} else {
-						// Moving to next stop: previous is sequence-1
-						dbPos.PreviousStopID = adjacent.PreviousStopID
-					}
+		if key, ok := adjacentLookupKey(pos); ok {
+			if adjacent, ok := adjacentStops[key]; ok {
+				// Set stop sequence
+				dbPos.NextStopSequence = &adjacent.StopSequence
+
+				if pos.Status == "STOPPED_AT" {
+					// Currently at a stop: previous is sequence-1, next is sequence+1
+					dbPos.PreviousStopID = adjacent.PreviousStopID
+					dbPos.NextStopID = adjacent.NextStopID
+				} else {
+					// Moving to next stop: previous is sequence-1
+					dbPos.PreviousStopID = adjacent.PreviousStopID
 				}
 			}
 		}
@@ -183,6 +225,21 @@ func (p *Poller) Poll(ctx context.Context) error {
 	return nil
 }
 
+// adjacentLookupKey returns the trip and stop to look up a vehicle's
+// scheduled neighbours by: its current stop, or else the stop it is heading to
+func adjacentLookupKey(pos VehiclePosition) (db.TripStop, bool) {
+	if pos.TripID == nil {
+		return db.TripStop{}, false
+	}
+	if pos.CurrentStopID != nil {
+		return db.TripStop{TripID: *pos.TripID, StopID: *pos.CurrentStopID}, true
+	}
+	if pos.NextStopID != nil {
+		return db.TripStop{TripID: *pos.TripID, StopID: *pos.NextStopID}, true
+	}
+	return db.TripStop{}, false
+}
+
 // aggregateDelayStats extracts delay observations from positions and updates hourly stats
 func (p *Poller) aggregateDelayStats(ctx context.Context, positions []db.RodaliesPosition) {
 	var observations []db.DelayObservation
@@ -228,8 +285,9 @@ func (p *Poller) fetchVehiclePositions(ctx context.Context) ([]VehiclePosition,
 			vehicleLabel = *vehicle.Vehicle.Label
 		}
 
-		// Filter: only Rodalies trains (labels starting with 'R')
-		if vehicleLabel == "" || !strings.HasPrefix(strings.ToUpper(vehicleLabel), "R") {
+		// Filter: only Rodalies trains (labels starting with 'R'). Checked
+		// on the first byte so non-Rodalies entities don't pay for ToUpper.
+		if vehicleLabel == "" || (vehicleLabel[0] != 'R' && vehicleLabel[0] != 'r') {
 			continue
 		}
 
@@ -305,16 +363,15 @@ func (p *Poller) fetchVehiclePositions(ctx context.Context) ([]VehiclePosition,
 	return positions, nil
 }
 
-// fetchTripUpdates fetches and parses the trip updates feed
-// Returns delay info and trip stops (for deriving previous stop)
-func (p *Poller) fetchTripUpdates(ctx context.Context) (map[DelayKey]TripDelay, map[string]*TripStops, error) {
+// fetchTripUpdates fetches and parses the trip updates feed into per-stop
+// delay info
+func (p *Poller) fetchTripUpdates(ctx context.Context) (map[DelayKey]TripDelay, error) {
 	feed, err := p.fetchFeed(ctx, p.cfg.GTFSTripUpdatesURL)
 	if err != nil {
-		return nil, nil, err
+		return nil, err
 	}
 
 	delays := make(map[DelayKey]TripDelay)
-	tripStopsMap := make(map[string]*TripStops)
 
 	for _, entity := range feed.Entity {
 		if entity.TripUpdate == nil {
@@ -328,22 +385,11 @@ func (p *Poller) fetchTripUpdates(ctx context.Context) (map[DelayKey]TripDelay,
 
 		tripID := *tripUpdate.Trip.TripId
 
-		// Collect stops for this trip
-		var stops []TripStop
-
 		for _, stu := range tripUpdate.StopTimeUpdate {
 			if stu.StopId == nil {
 				continue
 			}
 
-			// Build stop list with sequences
-			if stu.StopSequence != nil {
-				stops = append(stops, TripStop{
-					StopID:       *stu.StopId,
-					StopSequence: int(*stu.StopSequence),
-				})
-			}
-
 			delay := TripDelay{
 				TripID: tripID,
 				StopID: *stu.StopId,
@@ -383,52 +429,79 @@ func (p *Poller) fetchTripUpdates(ctx context.Context) (map[DelayKey]TripDelay,
 			key := DelayKey{TripID: tripID, StopID: *stu.StopId}
 			delays[key] = delay
 		}
-
-		// Sort stops by sequence and store
-		if len(stops) > 0 {
-			sort.Slice(stops, func(i, j int) bool {
-				return stops[i].StopSequence < stops[j].StopSequence
-			})
-			tripStopsMap[tripID] = &TripStops{Stops: stops}
-		}
 	}
 
-	return delays, tripStopsMap, nil
+	return delays, nil
 }
 
-// fetchFeed fetches a GTFS-RT feed from the given URL
+// fetchFeed fetches a GTFS-RT feed from the given URL. The message may be
+// shared with earlier polls (see feedCursor), so callers must not modify it.
 func (p *Poller) fetchFeed(ctx context.Context, url string) (*gtfs.FeedMessage, error) {
 	req, err := http.NewRequestWithContext(ctx, "GET", url, nil)
 	if err != nil {
 		return nil, fmt.Errorf("failed to create request: %w", err)
 	}
 
+	p.cursorMu.Lock()
+	cursor, hasCursor := p.cursors[url]
+	p.cursorMu.Unlock()
+	if hasCursor {
+		if cursor.etag != "" {
+			req.Header.Set("If-None-Match", cursor.etag)
+		}
+		if cursor.lastModified != "" {
+			req.Header.Set("If-Modified-Since", cursor.lastModified)
+		}
+	}
+
 	resp, err := p.client.Do(req)
 	if err != nil {
 		return nil, fmt.Errorf("failed to fetch feed: %w", err)
 	}
 	defer resp.Body.Close()
 
+	if resp.StatusCode == http.StatusNotModified && hasCursor {
+		return cursor.feed, nil
+	}
+
 	if resp.StatusCode != http.StatusOK {
+		// Drain the (small) error body so the connection can be reused
+		io.Copy(io.Discard, io.LimitReader(resp.Body, 64<<10))
 		return nil, fmt.Errorf("feed returned status %d", resp.StatusCode)
 	}
 
-	body, err := io.ReadAll(resp.Body)
-	if err != nil {
+	// Size the buffer from Content-Length up front so the body is read in
+	// one allocation instead of being grown and copied as it streams in.
+	var body bytes.Buffer
+	if resp.ContentLength > 0 {
+		body.Grow(int(resp.ContentLength))
+	}
+	if _, err := body.ReadFrom(resp.Body); err != nil {
 		return nil, fmt.Errorf("failed to read response: %w", err)
 	}
 
 	feed := &gtfs.FeedMessage{}
-	if err := proto.Unmarshal(body, feed); err != nil {
+	if err := feedUnmarshalOptions.Unmarshal(body.Bytes(), feed); err != nil {
 		return nil, fmt.Errorf("failed to parse protobuf: %w", err)
 	}
 
+	// Remember the validators, if the server sends any, for the next poll
+	etag, lastModified := resp.Header.Get("ETag"), resp.Header.Get("Last-Modified")
+	if etag != "" || lastModified != "" {
+		p.cursorMu.Lock()
+		p.cursors[url] = feedCursor{etag: etag, lastModified: lastModified, feed: feed}
+		p.cursorMu.Unlock()
+	} else if hasCursor {
+		p.cursorMu.Lock()
+		delete(p.cursors, url)
+		p.cursorMu.Unlock()
+	}
+
 	return feed, nil
 }
 
 // extractLineCode extracts the Rodalies line code from a vehicle label
 // Examples: "R4-77626-PLATF.(1)" -> "R4", "R2N-12345" -> "R2N", "RG1-xxx" -> "RG1"
 func extractLineCode(label string) string {
-	match := lineCodeRegex.FindString(strings.ToUpper(label))
-	return match
+	return strings.ToUpper(lineCodeRegex.FindString(label))
 }
@@ -51,14 +51,3 @@ var ScheduleRelationshipMap = map[int32]string{
 	2: "UNSCHEDULED",
 	3: "CANCELED",
 }
-
-// TripStop represents a single stop in a trip's sequence
-type TripStop struct {
-	StopID       string
-	StopSequence int
-}
-
-// TripStops holds an ordered list of stops for a trip
-type TripStops struct {
-	Stops []TripStop // Sorted by StopSequence
-}
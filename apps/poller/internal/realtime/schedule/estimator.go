@@ -5,6 +5,7 @@ import (
 	"database/sql"
 	"fmt"
 	"log"
+	"sort"
 	"sync"
 	"time"
 )
@@ -13,10 +14,32 @@ import (
 type Estimator struct {
 	queries        *Queries
 	madridLoc      *time.Location
-	stopTimesCache map[string][]TripStopTime // tripID -> stop times
+	stopTimesCache map[string]tripStops // tripID -> stop times
 	cacheMu        sync.RWMutex
 }
 
+// tripStops is a trip's stop times as cached by the estimator
+type tripStops struct {
+	stopTimes []TripStopTime
+	// ordered reports that arrival and departure times never decrease along
+	// the trip, which lets findCurrentSegment binary search for the segment
+	ordered bool
+}
+
+// newTripStops wraps stop times for the cache, checking their order once
+// rather than on every poll
+func newTripStops(stopTimes []TripStopTime) tripStops {
+	ordered := true
+	for i, st := range stopTimes {
+		if st.DepartureSeconds < st.ArrivalSeconds ||
+			(i > 0 && st.ArrivalSeconds < stopTimes[i-1].DepartureSeconds) {
+			ordered = false
+			break
+		}
+	}
+	return tripStops{stopTimes: stopTimes, ordered: ordered}
+}
+
 // NewEstimator creates a new schedule estimator
 func NewEstimator(db *sql.DB) (*Estimator, error) {
 	loc, err := time.LoadLocation(MadridTimezone)
@@ -27,7 +50,7 @@ func NewEstimator(db *sql.DB) (*Estimator, error) {
 	return &Estimator{
 		queries:        NewQueries(db),
 		madridLoc:      loc,
-		stopTimesCache: make(map[string][]TripStopTime),
+		stopTimesCache: make(map[string]tripStops),
 	}, nil
 }
 
@@ -50,6 +73,12 @@ func (e *Estimator) EstimatePositions(ctx context.Context, now time.Time) ([]Est
 		return nil, nil
 	}
 
+	// Load stop times for all uncached trips in one query rather than one
+	// query per trip on first sight
+	if err := e.prefetchStopTimes(ctx, trips); err != nil {
+		log.Printf("Schedule: failed to prefetch stop times: %v", err)
+	}
+
 	// Estimate positions for each active trip
 	var positions []EstimatedPosition
 	for _, trip := range trips {
@@ -70,17 +99,17 @@ func (e *Estimator) EstimatePositions(ctx context.Context, now time.Time) ([]Est
 // estimateTripPosition estimates the position for a single trip
 func (e *Estimator) estimateTripPosition(ctx context.Context, trip ActiveTrip, currentSeconds int, now time.Time) (*EstimatedPosition, error) {
 	// Get stop times for this trip (with caching)
-	stopTimes, err := e.getStopTimes(ctx, trip.TripID)
+	stops, err := e.getStopTimes(ctx, trip.TripID)
 	if err != nil {
 		return nil, err
 	}
 
-	if len(stopTimes) < 2 {
+	if len(stops.stopTimes) < 2 {
 		return nil, nil // Not enough stops to estimate position
 	}
 
 	// Find current segment (which two stops are we between?)
-	prevStop, nextStop, progress := e.findCurrentSegment(stopTimes, currentSeconds)
+	prevStop, nextStop, progress := e.findCurrentSegment(stops, currentSeconds)
 	if prevStop == nil || nextStop == nil {
 		return nil, nil // Trip hasn't started or has ended
 	}
@@ -143,8 +172,21 @@ func (e *Estimator) estimateTripPosition(ctx context.Context, trip ActiveTrip, c
 
 // findCurrentSegment finds the segment the vehicle is currently on
 // Returns (previousStop, nextStop, progressFraction)
-func (e *Estimator) findCurrentSegment(stopTimes []TripStopTime, currentSeconds int) (*TripStopTime, *TripStopTime, float64) {
-	for i := 0; i < len(stopTimes)-1; i++ {
+func (e *Estimator) findCurrentSegment(stops tripStops, currentSeconds int) (*TripStopTime, *TripStopTime, float64) {
+	stopTimes := stops.stopTimes
+
+	// With ordered times, the only candidate is the first segment whose
+	// arrival is not yet past; earlier segments have ended and later ones
+	// have not started
+	start, end := 0, len(stopTimes)-1
+	if stops.ordered {
+		start = sort.Search(end, func(i int) bool {
+			return stopTimes[i+1].ArrivalSeconds >= currentSeconds
+		})
+		end = min(start+1, end)
+	}
+
+	for i := start; i < end; i++ {
 		prevStop := &stopTimes[i]
 		nextStop := &stopTimes[i+1]
 
@@ -174,7 +216,7 @@ func (e *Estimator) findCurrentSegment(stopTimes []TripStopTime, currentSeconds
 }
 
 // getStopTimes returns stop times for a trip, using cache if available
-func (e *Estimator) getStopTimes(ctx context.Context, tripID string) ([]TripStopTime, error) {
+func (e *Estimator) getStopTimes(ctx context.Context, tripID string) (tripStops, error) {
 	// Check cache first
 	e.cacheMu.RLock()
 	if cached, ok := e.stopTimesCache[tripID]; ok {
@@ -186,21 +228,52 @@ func (e *Estimator) getStopTimes(ctx context.Context, tripID string) ([]TripStop
 	// Query from database
 	stopTimes, err := e.queries.GetTripStopTimes(ctx, tripID)
 	if err != nil {
-		return nil, err
+		return tripStops{}, err
 	}
+	stops := newTripStops(stopTimes)
 
 	// Cache the result
 	e.cacheMu.Lock()
-	e.stopTimesCache[tripID] = stopTimes
+	e.stopTimesCache[tripID] = stops
+	e.cacheMu.Unlock()
+
+	return stops, nil
+}
+
+// prefetchStopTimes fills the cache for every trip not already in it.
+// Trips without stop times are cached as empty so they aren't re-queried.
+func (e *Estimator) prefetchStopTimes(ctx context.Context, trips []ActiveTrip) error {
+	var missing []string
+	e.cacheMu.RLock()
+	for _, trip := range trips {
+		if _, ok := e.stopTimesCache[trip.TripID]; !ok {
+			missing = append(missing, trip.TripID)
+		}
+	}
+	e.cacheMu.RUnlock()
+
+	if len(missing) == 0 {
+		return nil
+	}
+
+	byTrip, err := e.queries.GetStopTimesForTrips(ctx, missing)
+	if err != nil {
+		return err
+	}
+
+	e.cacheMu.Lock()
+	for _, tripID := range missing {
+		e.stopTimesCache[tripID] = newTripStops(byTrip[tripID])
+	}
 	e.cacheMu.Unlock()
 
-	return stopTimes, nil
+	return nil
 }
 
 // ClearCache clears the stop times cache
 func (e *Estimator) ClearCache() {
 	e.cacheMu.Lock()
-	e.stopTimesCache = make(map[string][]TripStopTime)
+	e.stopTimesCache = make(map[string]tripStops)
 	e.cacheMu.Unlock()
 }
 
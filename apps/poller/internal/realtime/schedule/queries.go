@@ -3,6 +3,7 @@ package schedule
 import (
 	"context"
 	"database/sql"
+	"encoding/json"
 	"fmt"
 	"time"
 )
@@ -162,6 +163,63 @@ func (q *Queries) GetTripStopTimes(ctx context.Context, tripID string) ([]TripSt
 	return stopTimes, rows.Err()
 }
 
+// GetStopTimesForTrips returns stop times for several trips in one query,
+// keyed by trip ID and ordered by sequence. The IDs are passed as a single
+// JSON array and expanded with json_each, so the statement text stays the
+// same regardless of how many trips are requested.
+func (q *Queries) GetStopTimesForTrips(ctx context.Context, tripIDs []string) (map[string][]TripStopTime, error) {
+	result := make(map[string][]TripStopTime, len(tripIDs))
+	if len(tripIDs) == 0 {
+		return result, nil
+	}
+
+	idsJSON, err := json.Marshal(tripIDs)
+	if err != nil {
+		return nil, fmt.Errorf("failed to encode trip IDs: %w", err)
+	}
+
+	query := `
+		SELECT
+			st.trip_id,
+			st.stop_id,
+			COALESCE(s.stop_name, '') as stop_name,
+			COALESCE(s.stop_lat, 0) as stop_lat,
+			COALESCE(s.stop_lon, 0) as stop_lon,
+			st.stop_sequence,
+			st.arrival_seconds,
+			st.departure_seconds
+		FROM dim_stop_times st
+		LEFT JOIN dim_stops s ON st.stop_id = s.stop_id
+		WHERE st.trip_id IN (SELECT value FROM json_each(?))
+		ORDER BY st.trip_id, st.stop_sequence
+	`
+
+	rows, err := q.db.QueryContext(ctx, query, string(idsJSON))
+	if err != nil {
+		return nil, fmt.Errorf("failed to query stop times: %w", err)
+	}
+	defer rows.Close()
+
+	for rows.Next() {
+		var st TripStopTime
+		if err := rows.Scan(
+			&st.TripID,
+			&st.StopID,
+			&st.StopName,
+			&st.StopLat,
+			&st.StopLon,
+			&st.StopSequence,
+			&st.ArrivalSeconds,
+			&st.DepartureSeconds,
+		); err != nil {
+			return nil, fmt.Errorf("failed to scan stop time: %w", err)
+		}
+		result[st.TripID] = append(result[st.TripID], st)
+	}
+
+	return result, rows.Err()
+}
+
 // routeTypeToNetwork maps GTFS route_type to our network identifier
 func routeTypeToNetwork(routeType int) string {
 	switch routeType {
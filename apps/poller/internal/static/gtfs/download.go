@@ -5,6 +5,7 @@ import (
 	"io"
 	"net/http"
 	"os"
+	"path/filepath"
 	"time"
 )
 
@@ -24,18 +25,7 @@ func Download(url, destPath string) error {
 		return fmt.Errorf("download failed with status %d", resp.StatusCode)
 	}
 
-	out, err := os.Create(destPath)
-	if err != nil {
-		return fmt.Errorf("failed to create file: %w", err)
-	}
-	defer out.Close()
-
-	_, err = io.Copy(out, resp.Body)
-	if err != nil {
-		return fmt.Errorf("failed to write file: %w", err)
-	}
-
-	return nil
+	return writeFileAtomic(destPath, resp.Body)
 }
 
 // DownloadWithAuth downloads a GTFS zip file with TMB API authentication
@@ -58,16 +48,35 @@ func DownloadWithAuth(url, destPath, appID, appKey string) error {
 		return fmt.Errorf("download failed with status %d: %s", resp.StatusCode, string(body))
 	}
 
-	out, err := os.Create(destPath)
+	return writeFileAtomic(destPath, resp.Body)
+}
+
+// writeFileAtomic streams r into a temporary file next to destPath and renames
+// it into place once fully written, so an interrupted download never leaves a
+// truncated zip where the previous good one used to be.
+func writeFileAtomic(destPath string, r io.Reader) error {
+	tmp, err := os.CreateTemp(filepath.Dir(destPath), filepath.Base(destPath)+".*.tmp")
 	if err != nil {
 		return fmt.Errorf("failed to create file: %w", err)
 	}
-	defer out.Close()
+	tmpPath := tmp.Name()
+	defer os.Remove(tmpPath) // no-op after a successful rename
 
-	_, err = io.Copy(out, resp.Body)
-	if err != nil {
+	if _, err := io.Copy(tmp, r); err != nil {
+		tmp.Close()
+		return fmt.Errorf("failed to write file: %w", err)
+	}
+	// CreateTemp uses 0600; keep the permissions os.Create used to give
+	if err := tmp.Chmod(0644); err != nil {
+		tmp.Close()
+		return fmt.Errorf("failed to set file mode: %w", err)
+	}
+	if err := tmp.Close(); err != nil {
 		return fmt.Errorf("failed to write file: %w", err)
 	}
 
+	if err := os.Rename(tmpPath, destPath); err != nil {
+		return fmt.Errorf("failed to move file into place: %w", err)
+	}
 	return nil
 }
@@ -2,6 +2,7 @@ package gtfs
 
 import (
 	"archive/zip"
+	"bufio"
 	"encoding/csv"
 	"fmt"
 	"io"
@@ -122,13 +123,20 @@ func parseRoutes(f *zip.File) ([]Route, error) {
 	}
 	defer rc.Close()
 
-	reader := csv.NewReader(rc)
+	reader := NewCSVReader(rc)
 	header, err := reader.Read()
 	if err != nil {
 		return nil, err
 	}
 
 	idx := makeIndex(header)
+	routeTypeCol := Column(idx, "route_type")
+	routeIDCol := Column(idx, "route_id")
+	agencyIDCol := Column(idx, "agency_id")
+	routeShortNameCol := Column(idx, "route_short_name")
+	routeLongNameCol := Column(idx, "route_long_name")
+	routeColorCol := Column(idx, "route_color")
+	routeTextColorCol := Column(idx, "route_text_color")
 	var routes []Route
 
 	for {
@@ -140,16 +148,16 @@ func parseRoutes(f *zip.File) ([]Route, error) {
 			continue
 		}
 
-		routeType, _ := strconv.Atoi(getField(record, idx, "route_type"))
+		routeType, _ := strconv.Atoi(fieldAt(record, routeTypeCol))
 
 		routes = append(routes, Route{
-			RouteID:        getField(record, idx, "route_id"),
-			AgencyID:       getField(record, idx, "agency_id"),
-			RouteShortName: getField(record, idx, "route_short_name"),
-			RouteLongName:  getField(record, idx, "route_long_name"),
+			RouteID:        fieldAt(record, routeIDCol),
+			AgencyID:       fieldAt(record, agencyIDCol),
+			RouteShortName: fieldAt(record, routeShortNameCol),
+			RouteLongName:  fieldAt(record, routeLongNameCol),
 			RouteType:      routeType,
-			RouteColor:     getField(record, idx, "route_color"),
-			RouteTextColor: getField(record, idx, "route_text_color"),
+			RouteColor:     fieldAt(record, routeColorCol),
+			RouteTextColor: fieldAt(record, routeTextColorCol),
 		})
 	}
 
@@ -163,13 +171,20 @@ func parseStops(f *zip.File) ([]Stop, error) {
 	}
 	defer rc.Close()
 
-	reader := csv.NewReader(rc)
+	reader := NewCSVReader(rc)
 	header, err := reader.Read()
 	if err != nil {
 		return nil, err
 	}
 
 	idx := makeIndex(header)
+	stopLatCol := Column(idx, "stop_lat")
+	stopLonCol := Column(idx, "stop_lon")
+	locationTypeCol := Column(idx, "location_type")
+	stopIDCol := Column(idx, "stop_id")
+	stopCodeCol := Column(idx, "stop_code")
+	stopNameCol := Column(idx, "stop_name")
+	parentStationCol := Column(idx, "parent_station")
 	var stops []Stop
 
 	for {
@@ -181,18 +196,18 @@ func parseStops(f *zip.File) ([]Stop, error) {
 			continue
 		}
 
-		lat, _ := strconv.ParseFloat(getField(record, idx, "stop_lat"), 64)
-		lon, _ := strconv.ParseFloat(getField(record, idx, "stop_lon"), 64)
-		locType, _ := strconv.Atoi(getField(record, idx, "location_type"))
+		lat, _ := strconv.ParseFloat(fieldAt(record, stopLatCol), 64)
+		lon, _ := strconv.ParseFloat(fieldAt(record, stopLonCol), 64)
+		locType, _ := strconv.Atoi(fieldAt(record, locationTypeCol))
 
 		stops = append(stops, Stop{
-			StopID:        getField(record, idx, "stop_id"),
-			StopCode:      getField(record, idx, "stop_code"),
-			StopName:      getField(record, idx, "stop_name"),
+			StopID:        fieldAt(record, stopIDCol),
+			StopCode:      fieldAt(record, stopCodeCol),
+			StopName:      fieldAt(record, stopNameCol),
 			StopLat:       lat,
 			StopLon:       lon,
 			LocationType:  locType,
-			ParentStation: getField(record, idx, "parent_station"),
+			ParentStation: fieldAt(record, parentStationCol),
 		})
 	}
 
@@ -206,14 +221,21 @@ func parseTrips(f *zip.File) ([]Trip, error) {
 	}
 	defer rc.Close()
 
-	reader := csv.NewReader(rc)
+	reader := NewCSVReader(rc)
 	header, err := reader.Read()
 	if err != nil {
 		return nil, err
 	}
 
 	idx := makeIndex(header)
+	directionIDCol := Column(idx, "direction_id")
+	routeIDCol := Column(idx, "route_id")
+	serviceIDCol := Column(idx, "service_id")
+	tripIDCol := Column(idx, "trip_id")
+	tripHeadsignCol := Column(idx, "trip_headsign")
+	shapeIDCol := Column(idx, "shape_id")
 	var trips []Trip
+	pool := make(StringPool)
 
 	for {
 		record, err := reader.Read()
@@ -224,15 +246,15 @@ func parseTrips(f *zip.File) ([]Trip, error) {
 			continue
 		}
 
-		directionID, _ := strconv.Atoi(getField(record, idx, "direction_id"))
+		directionID, _ := strconv.Atoi(fieldAt(record, directionIDCol))
 
 		trips = append(trips, Trip{
-			RouteID:      getField(record, idx, "route_id"),
-			ServiceID:    getField(record, idx, "service_id"),
-			TripID:       getField(record, idx, "trip_id"),
-			TripHeadsign: getField(record, idx, "trip_headsign"),
+			RouteID:      pool.Intern(fieldAt(record, routeIDCol)),
+			ServiceID:    pool.Intern(fieldAt(record, serviceIDCol)),
+			TripID:       fieldAt(record, tripIDCol),
+			TripHeadsign: pool.Intern(fieldAt(record, tripHeadsignCol)),
 			DirectionID:  directionID,
-			ShapeID:      getField(record, idx, "shape_id"),
+			ShapeID:      pool.Intern(fieldAt(record, shapeIDCol)),
 		})
 	}
 
@@ -246,14 +268,20 @@ func parseShapes(f *zip.File) (map[string][]ShapePoint, error) {
 	}
 	defer rc.Close()
 
-	reader := csv.NewReader(rc)
+	reader := NewCSVReader(rc)
 	header, err := reader.Read()
 	if err != nil {
 		return nil, err
 	}
 
 	idx := makeIndex(header)
+	shapeIDCol := Column(idx, "shape_id")
+	shapePtLatCol := Column(idx, "shape_pt_lat")
+	shapePtLonCol := Column(idx, "shape_pt_lon")
+	shapePtSequenceCol := Column(idx, "shape_pt_sequence")
+	shapeDistTraveledCol := Column(idx, "shape_dist_traveled")
 	shapes := make(map[string][]ShapePoint)
+	pool := make(StringPool)
 
 	for {
 		record, err := reader.Read()
@@ -264,11 +292,11 @@ func parseShapes(f *zip.File) (map[string][]ShapePoint, error) {
 			continue
 		}
 
-		shapeID := getField(record, idx, "shape_id")
-		lat, _ := strconv.ParseFloat(getField(record, idx, "shape_pt_lat"), 64)
-		lon, _ := strconv.ParseFloat(getField(record, idx, "shape_pt_lon"), 64)
-		seq, _ := strconv.Atoi(getField(record, idx, "shape_pt_sequence"))
-		dist, _ := strconv.ParseFloat(getField(record, idx, "shape_dist_traveled"), 64)
+		shapeID := pool.Intern(fieldAt(record, shapeIDCol))
+		lat, _ := strconv.ParseFloat(fieldAt(record, shapePtLatCol), 64)
+		lon, _ := strconv.ParseFloat(fieldAt(record, shapePtLonCol), 64)
+		seq, _ := strconv.Atoi(fieldAt(record, shapePtSequenceCol))
+		dist, _ := strconv.ParseFloat(fieldAt(record, shapeDistTraveledCol), 64)
 
 		shapes[shapeID] = append(shapes[shapeID], ShapePoint{
 			ShapeID:           shapeID,
@@ -279,11 +307,15 @@ func parseShapes(f *zip.File) (map[string][]ShapePoint, error) {
 		})
 	}
 
-	// Sort each shape by sequence
-	for shapeID := range shapes {
-		sort.Slice(shapes[shapeID], func(i, j int) bool {
-			return shapes[shapeID][i].ShapePtSequence < shapes[shapeID][j].ShapePtSequence
-		})
+	// Sort each shape by sequence. Feeds almost always list points in
+	// sequence order already, so check first and only sort the exceptions.
+	for _, points := range shapes {
+		less := func(i, j int) bool {
+			return points[i].ShapePtSequence < points[j].ShapePtSequence
+		}
+		if !sort.SliceIsSorted(points, less) {
+			sort.Slice(points, less)
+		}
 	}
 
 	return shapes, nil
@@ -296,14 +328,20 @@ func parseStopTimes(f *zip.File) ([]StopTime, error) {
 	}
 	defer rc.Close()
 
-	reader := csv.NewReader(rc)
+	reader := NewCSVReader(rc)
 	header, err := reader.Read()
 	if err != nil {
 		return nil, err
 	}
 
 	idx := makeIndex(header)
+	stopSequenceCol := Column(idx, "stop_sequence")
+	tripIDCol := Column(idx, "trip_id")
+	arrivalTimeCol := Column(idx, "arrival_time")
+	departureTimeCol := Column(idx, "departure_time")
+	stopIDCol := Column(idx, "stop_id")
 	var stopTimes []StopTime
+	pool := make(StringPool)
 
 	for {
 		record, err := reader.Read()
@@ -314,13 +352,13 @@ func parseStopTimes(f *zip.File) ([]StopTime, error) {
 			continue
 		}
 
-		seq, _ := strconv.Atoi(getField(record, idx, "stop_sequence"))
+		seq, _ := strconv.Atoi(fieldAt(record, stopSequenceCol))
 
 		stopTimes = append(stopTimes, StopTime{
-			TripID:        getField(record, idx, "trip_id"),
-			ArrivalTime:   getField(record, idx, "arrival_time"),
-			DepartureTime: getField(record, idx, "departure_time"),
-			StopID:        getField(record, idx, "stop_id"),
+			TripID:        pool.Intern(fieldAt(record, tripIDCol)),
+			ArrivalTime:   pool.Intern(fieldAt(record, arrivalTimeCol)),
+			DepartureTime: pool.Intern(fieldAt(record, departureTimeCol)),
+			StopID:        pool.Intern(fieldAt(record, stopIDCol)),
 			StopSequence:  seq,
 		})
 	}
@@ -335,13 +373,16 @@ func parseAgencies(f *zip.File) ([]Agency, error) {
 	}
 	defer rc.Close()
 
-	reader := csv.NewReader(rc)
+	reader := NewCSVReader(rc)
 	header, err := reader.Read()
 	if err != nil {
 		return nil, err
 	}
 
 	idx := makeIndex(header)
+	agencyIDCol := Column(idx, "agency_id")
+	agencyNameCol := Column(idx, "agency_name")
+	agencyURLCol := Column(idx, "agency_url")
 	var agencies []Agency
 
 	for {
@@ -354,9 +395,9 @@ func parseAgencies(f *zip.File) ([]Agency, error) {
 		}
 
 		agencies = append(agencies, Agency{
-			AgencyID:   getField(record, idx, "agency_id"),
-			AgencyName: getField(record, idx, "agency_name"),
-			AgencyURL:  getField(record, idx, "agency_url"),
+			AgencyID:   fieldAt(record, agencyIDCol),
+			AgencyName: fieldAt(record, agencyNameCol),
+			AgencyURL:  fieldAt(record, agencyURLCol),
 		})
 	}
 
@@ -370,13 +411,23 @@ func parseCalendar(f *zip.File) ([]Calendar, error) {
 	}
 	defer rc.Close()
 
-	reader := csv.NewReader(rc)
+	reader := NewCSVReader(rc)
 	header, err := reader.Read()
 	if err != nil {
 		return nil, err
 	}
 
 	idx := makeIndex(header)
+	serviceIDCol := Column(idx, "service_id")
+	mondayCol := Column(idx, "monday")
+	tuesdayCol := Column(idx, "tuesday")
+	wednesdayCol := Column(idx, "wednesday")
+	thursdayCol := Column(idx, "thursday")
+	fridayCol := Column(idx, "friday")
+	saturdayCol := Column(idx, "saturday")
+	sundayCol := Column(idx, "sunday")
+	startDateCol := Column(idx, "start_date")
+	endDateCol := Column(idx, "end_date")
 	var calendars []Calendar
 
 	for {
@@ -389,16 +440,16 @@ func parseCalendar(f *zip.File) ([]Calendar, error) {
 		}
 
 		calendars = append(calendars, Calendar{
-			ServiceID: getField(record, idx, "service_id"),
-			Monday:    getField(record, idx, "monday") == "1",
-			Tuesday:   getField(record, idx, "tuesday") == "1",
-			Wednesday: getField(record, idx, "wednesday") == "1",
-			Thursday:  getField(record, idx, "thursday") == "1",
-			Friday:    getField(record, idx, "friday") == "1",
-			Saturday:  getField(record, idx, "saturday") == "1",
-			Sunday:    getField(record, idx, "sunday") == "1",
-			StartDate: getField(record, idx, "start_date"),
-			EndDate:   getField(record, idx, "end_date"),
+			ServiceID: fieldAt(record, serviceIDCol),
+			Monday:    fieldAt(record, mondayCol) == "1",
+			Tuesday:   fieldAt(record, tuesdayCol) == "1",
+			Wednesday: fieldAt(record, wednesdayCol) == "1",
+			Thursday:  fieldAt(record, thursdayCol) == "1",
+			Friday:    fieldAt(record, fridayCol) == "1",
+			Saturday:  fieldAt(record, saturdayCol) == "1",
+			Sunday:    fieldAt(record, sundayCol) == "1",
+			StartDate: fieldAt(record, startDateCol),
+			EndDate:   fieldAt(record, endDateCol),
 		})
 	}
 
@@ -412,13 +463,16 @@ func parseCalendarDates(f *zip.File) ([]CalendarDate, error) {
 	}
 	defer rc.Close()
 
-	reader := csv.NewReader(rc)
+	reader := NewCSVReader(rc)
 	header, err := reader.Read()
 	if err != nil {
 		return nil, err
 	}
 
 	idx := makeIndex(header)
+	exceptionTypeCol := Column(idx, "exception_type")
+	serviceIDCol := Column(idx, "service_id")
+	dateCol := Column(idx, "date")
 	var calendarDates []CalendarDate
 
 	for {
@@ -430,11 +484,11 @@ func parseCalendarDates(f *zip.File) ([]CalendarDate, error) {
 			continue
 		}
 
-		exceptionType, _ := strconv.Atoi(getField(record, idx, "exception_type"))
+		exceptionType, _ := strconv.Atoi(fieldAt(record, exceptionTypeCol))
 
 		calendarDates = append(calendarDates, CalendarDate{
-			ServiceID:     getField(record, idx, "service_id"),
-			Date:          getField(record, idx, "date"),
+			ServiceID:     fieldAt(record, serviceIDCol),
+			Date:          fieldAt(record, dateCol),
 			ExceptionType: exceptionType,
 		})
 	}
@@ -442,17 +496,60 @@ func parseCalendarDates(f *zip.File) ([]CalendarDate, error) {
 	return calendarDates, nil
 }
 
+// csvBufferSize is the read buffer placed in front of each zip member so the
+// decompressor is driven in large chunks rather than csv.Reader's default 4KB.
+const csvBufferSize = 1 << 20
+
+// NewCSVReader reads a GTFS file through a csvBufferSize buffer and reuses the
+// record slice between rows: parsers read fields by position and keep only
+// the (immutable) field strings.
+func NewCSVReader(r io.Reader) *csv.Reader {
+	reader := csv.NewReader(bufio.NewReaderSize(r, csvBufferSize))
+	reader.ReuseRecord = true
+	return reader
+}
+
 func makeIndex(header []string) map[string]int {
 	idx := make(map[string]int)
 	for i, h := range header {
+		if i == 0 {
+			h = strings.TrimPrefix(h, "\ufeff") // UTF-8 BOM written by some exporters
+		}
 		idx[strings.TrimSpace(h)] = i
 	}
 	return idx
 }
 
-func getField(record []string, idx map[string]int, field string) string {
-	if i, ok := idx[field]; ok && i < len(record) {
+// Column returns the record position of field, or -1 if the file lacks it.
+// Parsers resolve their columns once so rows are read by position.
+func Column(idx map[string]int, field string) int {
+	if i, ok := idx[field]; ok {
+		return i
+	}
+	return -1
+}
+
+func fieldAt(record []string, i int) string {
+	if i >= 0 && i < len(record) {
 		return strings.TrimSpace(record[i])
 	}
 	return ""
 }
+
+// StringPool deduplicates repeated field values (IDs, times) within a file.
+// csv.Reader backs all fields of a record with one string, so keeping a bare
+// field would also keep the whole line alive; Intern stores a copy instead.
+// unique.Make is not used because its table only holds a value while a
+// Handle to it is alive: the parsed structs keep plain strings, so entries
+// could be collected mid-parse and later rows would get fresh copies. A
+// per-file map shares every value and is released along with the parse.
+type StringPool map[string]string
+
+func (p StringPool) Intern(s string) string {
+	if v, ok := p[s]; ok {
+		return v
+	}
+	s = strings.Clone(s)
+	p[s] = s
+	return s
+}
@@ -419,35 +419,25 @@ func populateDimensionTables(database *db.DB, network string, data *gtfs.Data) e
 
 // parseTimeToSeconds converts GTFS time format (HH:MM:SS) to seconds since midnight
 func parseTimeToSeconds(timeStr string) int {
-	if timeStr == "" {
-		return 0
+	// Accumulate each ':'-separated field in one pass instead of
+	// strings.Split; this runs twice per stop_times row. Non-digits are
+	// skipped, and hours may exceed 24 for after-midnight service.
+	var parts [3]int
+	field := 0
+	for i := 0; i < len(timeStr); i++ {
+		c := timeStr[i]
+		if c == ':' {
+			field++
+			continue
+		}
+		if field < len(parts) && c >= '0' && c <= '9' {
+			parts[field] = parts[field]*10 + int(c-'0')
+		}
 	}
-	parts := strings.Split(timeStr, ":")
-	if len(parts) < 2 {
+	if field < 1 {
 		return 0
 	}
-	var hours, minutes, seconds int
-	if len(parts) >= 1 {
-		_, _ = strings.NewReader(parts[0]).Read(make([]byte, 0))
-		hours = parseIntSafe(parts[0])
-	}
-	if len(parts) >= 2 {
-		minutes = parseIntSafe(parts[1])
-	}
-	if len(parts) >= 3 {
-		seconds = parseIntSafe(parts[2])
-	}
-	return hours*3600 + minutes*60 + seconds
-}
-
-func parseIntSafe(s string) int {
-	var result int
-	for _, c := range s {
-		if c >= '0' && c <= '9' {
-			result = result*10 + int(c-'0')
-		}
-	}
-	return result
+	return parts[0]*3600 + parts[1]*60 + parts[2]
 }
 
 // fileChecksum calculates SHA256 checksum of a file
@@ -10,6 +10,7 @@ import (
 	"path/filepath"
 	"sort"
 	"strings"
+	"sync"
 	"time"
 
 	"github.com/mini-rodalies-3d/poller/internal/static/gtfs"
@@ -216,11 +217,14 @@ func Generate(data *gtfs.Data, outputDir string) error {
 	// Build route to line mapping
 	routeToLine := buildRouteToLineMapping(data.Routes)
 
+	// Resolve each trip's line and each line's longest shape in one trips pass
+	tripToLine, lineShapes := indexTrips(data, routeToLine)
+
 	// Build stop to lines mapping (which lines serve each stop)
-	stopToLines := buildStopToLinesMapping(data.Trips, data.StopTimes, routeToLine)
+	stopToLines := buildStopToLinesMapping(data.StopTimes, tripToLine)
 
 	// Generate line GeoJSON files
-	lineManifests, rodaliesLines, err := generateLineFiles(data, routeToLine, linesDir, nowStr)
+	lineManifests, rodaliesLines, lineFeatures, err := generateLineFiles(data, routeToLine, lineShapes, linesDir, nowStr)
 	if err != nil {
 		return fmt.Errorf("failed to generate line files: %w", err)
 	}
@@ -271,7 +275,7 @@ func Generate(data *gtfs.Data, outputDir string) error {
 	}
 
 	// Generate combined LineGeometry.geojson
-	if err := generateCombinedLineGeometry(data, routeToLine, rodaliesLines, outputDir, nowStr); err != nil {
+	if err := generateCombinedLineGeometry(lineFeatures, rodaliesLines, outputDir); err != nil {
 		log.Printf("Warning: failed to generate combined LineGeometry.geojson: %v", err)
 	}
 
@@ -329,56 +333,60 @@ func buildRouteToLineMapping(routes []gtfs.Route) map[string]string {
 	return mapping
 }
 
-func buildStopToLinesMapping(trips []gtfs.Trip, stopTimes []gtfs.StopTime, routeToLine map[string]string) map[string]map[string]bool {
-	// First, build trip to line mapping
+// indexTrips maps each Rodalies trip to its line and picks the longest shape
+// for each line, in a single pass over trips.
+func indexTrips(data *gtfs.Data, routeToLine map[string]string) (map[string]string, map[string][]gtfs.ShapePoint) {
 	tripToLine := make(map[string]string)
-	for _, trip := range trips {
-		if line, ok := routeToLine[trip.RouteID]; ok {
-			tripToLine[trip.TripID] = line
-		}
-	}
-
-	// Then, build stop to lines mapping
-	stopToLines := make(map[string]map[string]bool)
-	for _, st := range stopTimes {
-		if line, ok := tripToLine[st.TripID]; ok {
-			if stopToLines[st.StopID] == nil {
-				stopToLines[st.StopID] = make(map[string]bool)
-			}
-			stopToLines[st.StopID][line] = true
-		}
-	}
-
-	return stopToLines
-}
-
-func generateLineFiles(data *gtfs.Data, routeToLine map[string]string, linesDir, nowStr string) ([]ManifestLine, []RodaliesLine, error) {
-	// Group shapes by line
-	lineShapes := make(map[string][][2]float64)
+	lineShapes := make(map[string][]gtfs.ShapePoint)
 
 	for _, trip := range data.Trips {
 		lineCode, ok := routeToLine[trip.RouteID]
-		if !ok || trip.ShapeID == "" {
+		if !ok {
 			continue
 		}
+		tripToLine[trip.TripID] = lineCode
 
+		if trip.ShapeID == "" {
+			continue
+		}
 		shapePoints, ok := data.Shapes[trip.ShapeID]
 		if !ok {
 			continue
 		}
 
-		// Use the longest shape for each line
-		coords := make([][2]float64, len(shapePoints))
-		for i, sp := range shapePoints {
-			coords[i] = [2]float64{sp.ShapePtLon, sp.ShapePtLat}
+		// Coordinates are only built later for the winning shapes
+		if existing, ok := lineShapes[lineCode]; !ok || len(shapePoints) > len(existing) {
+			lineShapes[lineCode] = shapePoints
 		}
+	}
 
-		if existing, ok := lineShapes[lineCode]; !ok || len(coords) > len(existing) {
-			lineShapes[lineCode] = coords
+	return tripToLine, lineShapes
+}
+
+func buildStopToLinesMapping(stopTimes []gtfs.StopTime, tripToLine map[string]string) map[string]map[string]bool {
+	stopToLines := make(map[string]map[string]bool)
+	// stop_times.txt lists each trip's rows contiguously, so look a trip's
+	// line up once per run of rows rather than once per row
+	var prevTrip, line string
+	var ok bool
+	for _, st := range stopTimes {
+		if st.TripID != prevTrip {
+			prevTrip = st.TripID
+			line, ok = tripToLine[prevTrip]
+		}
+		if ok {
+			if stopToLines[st.StopID] == nil {
+				stopToLines[st.StopID] = make(map[string]bool)
+			}
+			stopToLines[st.StopID][line] = true
 		}
 	}
 
-	// Also get line names from routes
+	return stopToLines
+}
+
+func generateLineFiles(data *gtfs.Data, routeToLine map[string]string, lineShapes map[string][]gtfs.ShapePoint, linesDir, nowStr string) ([]ManifestLine, []RodaliesLine, []LineFeature, error) {
+	// Get line names from routes
 	lineNames := make(map[string]string)
 	for _, route := range data.Routes {
 		if lineCode, ok := routeToLine[route.RouteID]; ok {
@@ -392,6 +400,7 @@ func generateLineFiles(data *gtfs.Data, routeToLine map[string]string, linesDir,
 
 	var manifests []ManifestLine
 	var rodaliesLines []RodaliesLine
+	var features []LineFeature
 
 	// Sort lines for consistent output
 	var sortedLines []string
@@ -399,16 +408,22 @@ func generateLineFiles(data *gtfs.Data, routeToLine map[string]string, linesDir,
 		sortedLines = append(sortedLines, lineCode)
 	}
 	sort.Strings(sortedLines)
+	orders := lineOrders(sortedLines)
 
 	for _, lineCode := range sortedLines {
-		coords := lineShapes[lineCode]
-		if len(coords) < 2 {
+		shapePoints := lineShapes[lineCode]
+		if len(shapePoints) < 2 {
 			continue
 		}
 
+		coords := make([][2]float64, len(shapePoints))
+		for i, sp := range shapePoints {
+			coords[i] = [2]float64{sp.ShapePtLon, sp.ShapePtLat}
+		}
+
 		color := LineColorMap[lineCode]
 
-		order := LineOrderMap[lineCode]
+		order := orders[lineCode]
 		name := lineNames[lineCode]
 		if name == "" {
 			name = lineCode
@@ -434,23 +449,12 @@ func generateLineFiles(data *gtfs.Data, routeToLine map[string]string, linesDir,
 			},
 		}
 
-		// Write file
-		filePath := filepath.Join(linesDir, lineCode+".geojson")
-		data, err := json.MarshalIndent(feature, "", "  ")
-		if err != nil {
-			return nil, nil, err
-		}
-
-		if err := os.WriteFile(filePath, data, 0644); err != nil {
-			return nil, nil, err
-		}
-
-		checksum := sha256Sum(data)
+		features = append(features, feature)
 
+		// Checksum is filled in once the file has been written
 		manifests = append(manifests, ManifestLine{
-			ID:       lineCode,
-			Checksum: checksum,
-			Path:     fmt.Sprintf("lines/%s.geojson", lineCode),
+			ID:   lineCode,
+			Path: fmt.Sprintf("lines/%s.geojson", lineCode),
 		})
 
 		rodaliesLines = append(rodaliesLines, RodaliesLine{
@@ -464,12 +468,31 @@ func generateLineFiles(data *gtfs.Data, routeToLine map[string]string, linesDir,
 		})
 	}
 
+	// Write line files concurrently; they are independent and each result
+	// goes back into its own manifest slot, so output order is unchanged.
+	errs := make([]error, len(features))
+	var wg sync.WaitGroup
+	for i := range features {
+		wg.Add(1)
+		go func(i int) {
+			defer wg.Done()
+			filePath := filepath.Join(linesDir, features[i].ID+".geojson")
+			manifests[i].Checksum, errs[i] = writeJSONWithChecksum(filePath, features[i])
+		}(i)
+	}
+	wg.Wait()
+	for _, err := range errs {
+		if err != nil {
+			return nil, nil, nil, err
+		}
+	}
+
 	// Sort by order
-	sort.Slice(rodaliesLines, func(i, j int) bool {
+	sort.SliceStable(rodaliesLines, func(i, j int) bool {
 		return rodaliesLines[i].Order < rodaliesLines[j].Order
 	})
 
-	return manifests, rodaliesLines, nil
+	return manifests, rodaliesLines, features, nil
 }
 
 func generateStations(stops []gtfs.Stop, stopToLines map[string]map[string]bool, outputDir string) (string, error) {
@@ -516,9 +539,14 @@ func generateStations(stops []gtfs.Stop, stopToLines map[string]map[string]bool,
 		})
 	}
 
-	// Sort by name for consistent output
+	// Sort by name for consistent output; stations sharing a name are
+	// ordered by ID so the file (and its checksum) is stable across runs
 	sort.Slice(features, func(i, j int) bool {
-		return features[i].Properties.Name < features[j].Properties.Name
+		a, b := features[i].Properties, features[j].Properties
+		if a.Name != b.Name {
+			return a.Name < b.Name
+		}
+		return a.ID < b.ID
 	})
 
 	fc := StationFeatureCollection{
@@ -526,63 +554,73 @@ func generateStations(stops []gtfs.Stop, stopToLines map[string]map[string]bool,
 		Features: features,
 	}
 
-	data, err := json.MarshalIndent(fc, "", "  ")
-	if err != nil {
-		return "", err
-	}
-
-	if err := os.WriteFile(filepath.Join(outputDir, "Station.geojson"), data, 0644); err != nil {
-		return "", err
-	}
-
-	return sha256Sum(data), nil
+	return writeJSONWithChecksum(filepath.Join(outputDir, "Station.geojson"), fc)
 }
 
-func generateCombinedLineGeometry(data *gtfs.Data, routeToLine map[string]string, rodaliesLines []RodaliesLine, outputDir, nowStr string) error {
-	type CombinedFeature struct {
-		Type       string              `json:"type"`
-		ID         string              `json:"id"`
-		Properties LineFeatureProps    `json:"properties"`
-		Geometry   LineStringGeometry  `json:"geometry"`
-	}
-
+// generateCombinedLineGeometry writes LineGeometry.geojson from the line
+// features already built for the per-line files, in display order.
+func generateCombinedLineGeometry(features []LineFeature, rodaliesLines []RodaliesLine, outputDir string) error {
 	type CombinedFC struct {
-		Type     string            `json:"type"`
-		Features []CombinedFeature `json:"features"`
+		Type     string        `json:"type"`
+		Features []LineFeature `json:"features"`
 	}
 
-	// Read individual line files and combine
-	linesDir := filepath.Join(outputDir, "lines")
-	var features []CombinedFeature
+	byID := make(map[string]LineFeature, len(features))
+	for _, feature := range features {
+		byID[feature.ID] = feature
+	}
 
+	combined := make([]LineFeature, 0, len(rodaliesLines))
 	for _, line := range rodaliesLines {
-		filePath := filepath.Join(linesDir, line.ID+".geojson")
-		fileData, err := os.ReadFile(filePath)
-		if err != nil {
-			continue
-		}
-
-		var feature LineFeature
-		if err := json.Unmarshal(fileData, &feature); err != nil {
-			continue
+		if feature, ok := byID[line.ID]; ok {
+			combined = append(combined, feature)
 		}
-
-		features = append(features, CombinedFeature{
-			Type:       feature.Type,
-			ID:         feature.ID,
-			Properties: feature.Properties,
-			Geometry:   feature.Geometry,
-		})
 	}
 
 	fc := CombinedFC{
 		Type:     "FeatureCollection",
-		Features: features,
+		Features: combined,
 	}
 
 	return writeJSON(filepath.Join(outputDir, "LineGeometry.geojson"), fc)
 }
 
+// firstUnlistedLineOrder is the order given to the first line missing from
+// LineOrderMap, computed once since the map is fixed.
+var firstUnlistedLineOrder = func() int {
+	next := 0
+	for _, order := range LineOrderMap {
+		if order >= next {
+			next = order + 1
+		}
+	}
+	return next
+}()
+
+// lineOrders assigns a display order to each line code. Lines listed in
+// LineOrderMap keep their order; any others follow them, sorted by code,
+// so they never tie with a listed line.
+func lineOrders(lineCodes []string) map[string]int {
+	next := firstUnlistedLineOrder
+
+	var unlisted []string
+	orders := make(map[string]int, len(lineCodes))
+	for _, lineCode := range lineCodes {
+		if order, ok := LineOrderMap[lineCode]; ok {
+			orders[lineCode] = order
+		} else {
+			unlisted = append(unlisted, lineCode)
+		}
+	}
+
+	sort.Strings(unlisted)
+	for _, lineCode := range unlisted {
+		orders[lineCode] = next
+		next++
+	}
+	return orders
+}
+
 func computeViewport(stops []gtfs.Stop) MapViewport {
 	// Always use Barcelona viewport for this Barcelona-focused app.
 	// The Renfe GTFS data covers all of Spain's Rodalies networks (Madrid, Valencia, etc.),
@@ -600,11 +638,32 @@ func computeViewport(stops []gtfs.Stop) MapViewport {
 }
 
 func writeJSON(path string, v interface{}) error {
+	_, err := marshalToFile(path, v)
+	return err
+}
+
+// writeJSONWithChecksum is writeJSON that also returns the SHA-256 of the
+// bytes written, for the manifest
+func writeJSONWithChecksum(path string, v interface{}) (string, error) {
+	data, err := marshalToFile(path, v)
+	if err != nil {
+		return "", err
+	}
+	return sha256Sum(data), nil
+}
+
+// marshalToFile writes v as indented JSON and returns the bytes written. A
+// partially written file is removed on failure.
+func marshalToFile(path string, v interface{}) ([]byte, error) {
 	data, err := json.MarshalIndent(v, "", "  ")
 	if err != nil {
-		return err
+		return nil, err
+	}
+	if err := os.WriteFile(path, data, 0644); err != nil {
+		os.Remove(path)
+		return nil, err
 	}
-	return os.WriteFile(path, data, 0644)
+	return data, nil
 }
 
 func sha256Sum(data []byte) string {
@@ -255,3 +255,26 @@ func assertBarcelonaViewport(t *testing.T, viewport MapViewport) {
 		t.Errorf("NE bound latitude %f suggests all-Spain bounds, not Catalonia", neLat)
 	}
 }
+
+// TestLineOrdersPlacesUnlistedLinesLast verifies that lines missing from
+// LineOrderMap are ordered after every listed line, by code, instead of
+// defaulting to 0 and tying with R1.
+func TestLineOrdersPlacesUnlistedLinesLast(t *testing.T) {
+	orders := lineOrders([]string{"RZ2", "R1", "RZ1", "RT2"})
+
+	if orders["R1"] != LineOrderMap["R1"] {
+		t.Errorf("R1 order = %d, want %d", orders["R1"], LineOrderMap["R1"])
+	}
+	if orders["RT2"] != LineOrderMap["RT2"] {
+		t.Errorf("RT2 order = %d, want %d", orders["RT2"], LineOrderMap["RT2"])
+	}
+
+	for _, order := range LineOrderMap {
+		if orders["RZ1"] <= order {
+			t.Fatalf("unlisted RZ1 order %d should come after listed order %d", orders["RZ1"], order)
+		}
+	}
+	if orders["RZ2"] != orders["RZ1"]+1 {
+		t.Errorf("RZ2 order = %d, want %d", orders["RZ2"], orders["RZ1"]+1)
+	}
+}
@@ -8,8 +8,10 @@ import (
 	"log"
 	"os"
 	"path/filepath"
+	"runtime"
 	"sort"
 	"strings"
+	"sync"
 	"time"
 
 	"github.com/mini-rodalies-3d/poller/internal/static/gtfs"
@@ -92,16 +94,25 @@ func Generate(data *gtfs.Data, outputDir string) error {
 	nowStr := now.Format(time.RFC3339)
 
 	// Separate routes by type
-	metroRoutes := filterRoutesByType(data.Routes, RouteTypeMetro)
-	funicularRoutes := filterRoutesByType(data.Routes, RouteTypeFunicular)
-	busRoutes := filterRoutesByType(data.Routes, RouteTypeBus)
+	routesByType := groupRoutesByType(data.Routes)
+	metroRoutes := routesByType[RouteTypeMetro]
+	funicularRoutes := routesByType[RouteTypeFunicular]
+	busRoutes := routesByType[RouteTypeBus]
 
 	// Combine metro and funicular
 	metroRoutes = append(metroRoutes, funicularRoutes...)
 
 	// Build route mappings
 	routeToLine := buildRouteToLineMapping(metroRoutes)
-	stopToLines := buildStopToLinesMapping(data.Trips, data.StopTimes, routeToLine)
+	funicularRouteToLine := buildRouteToLineMapping(funicularRoutes)
+	busRouteToLine := buildRouteToLineMapping(busRoutes)
+
+	// Resolve stop to lines for all three mappings in one pass over stop_times
+	stopToLinesByMapping := buildStopToLinesMappings(data.Trips, data.StopTimes,
+		routeToLine, funicularRouteToLine, busRouteToLine)
+	stopToLines := stopToLinesByMapping[0]
+	funicularStopToLines := stopToLinesByMapping[1]
+	busStopToLines := stopToLinesByMapping[2]
 
 	// Generate metro line files
 	if err := generateMetroLineFiles(data, metroRoutes, routeToLine, metroLinesDir, nowStr); err != nil {
@@ -114,16 +125,11 @@ func Generate(data *gtfs.Data, outputDir string) error {
 	}
 
 	// Generate funicular stations separately
-	funicularRouteToLine := buildRouteToLineMapping(funicularRoutes)
-	funicularStopToLines := buildStopToLinesMapping(data.Trips, data.StopTimes, funicularRouteToLine)
 	if err := generateFunicularStations(data.Stops, funicularStopToLines, metroDir); err != nil {
 		log.Printf("Warning: failed to generate funicular stations: %v", err)
 	}
 
 	// Generate bus data
-	busRouteToLine := buildRouteToLineMapping(busRoutes)
-	busStopToLines := buildStopToLinesMapping(data.Trips, data.StopTimes, busRouteToLine)
-
 	if err := generateBusRouteFiles(data, busRoutes, busRouteToLine, busRoutesDir, nowStr); err != nil {
 		log.Printf("Warning: failed to generate bus routes: %v", err)
 	}
@@ -141,14 +147,13 @@ func Generate(data *gtfs.Data, outputDir string) error {
 	return nil
 }
 
-func filterRoutesByType(routes []gtfs.Route, routeType int) []gtfs.Route {
-	var filtered []gtfs.Route
+// groupRoutesByType splits routes by GTFS route_type in a single pass
+func groupRoutesByType(routes []gtfs.Route) map[int][]gtfs.Route {
+	grouped := make(map[int][]gtfs.Route)
 	for _, route := range routes {
-		if route.RouteType == routeType {
-			filtered = append(filtered, route)
-		}
+		grouped[route.RouteType] = append(grouped[route.RouteType], route)
 	}
-	return filtered
+	return grouped
 }
 
 func buildRouteToLineMapping(routes []gtfs.Route) map[string]string {
@@ -164,37 +169,99 @@ func buildRouteToLineMapping(routes []gtfs.Route) map[string]string {
 }
 
 func buildStopToLinesMapping(trips []gtfs.Trip, stopTimes []gtfs.StopTime, routeToLine map[string]string) map[string]map[string]bool {
-	tripToLine := make(map[string]string)
+	return buildStopToLinesMappings(trips, stopTimes, routeToLine)[0]
+}
+
+// buildStopToLinesMappings returns one stop to lines mapping per routeToLine
+// mapping, scanning trips and stop_times only once for all of them.
+func buildStopToLinesMappings(trips []gtfs.Trip, stopTimes []gtfs.StopTime, routeToLines ...map[string]string) []map[string]map[string]bool {
+	type tripLine struct {
+		mapping int
+		line    string
+	}
+
+	tripToLines := make(map[string][]tripLine)
 	for _, trip := range trips {
-		if line, ok := routeToLine[trip.RouteID]; ok {
-			tripToLine[trip.TripID] = line
+		for i, routeToLine := range routeToLines {
+			if line, ok := routeToLine[trip.RouteID]; ok {
+				tripToLines[trip.TripID] = append(tripToLines[trip.TripID], tripLine{mapping: i, line: line})
+			}
 		}
 	}
 
-	stopToLines := make(map[string]map[string]bool)
+	stopToLines := make([]map[string]map[string]bool, len(routeToLines))
+	for i := range stopToLines {
+		stopToLines[i] = make(map[string]map[string]bool)
+	}
+	// stop_times.txt lists each trip's rows contiguously, so look a trip's
+	// lines up once per run of rows rather than once per row
+	var prevTrip string
+	var lines []tripLine
 	for _, st := range stopTimes {
-		if line, ok := tripToLine[st.TripID]; ok {
-			if stopToLines[st.StopID] == nil {
-				stopToLines[st.StopID] = make(map[string]bool)
+		if st.TripID != prevTrip {
+			prevTrip = st.TripID
+			lines = tripToLines[prevTrip]
+		}
+		for _, tl := range lines {
+			m := stopToLines[tl.mapping]
+			if m[st.StopID] == nil {
+				m[st.StopID] = make(map[string]bool)
 			}
-			stopToLines[st.StopID][line] = true
+			m[st.StopID][tl.line] = true
 		}
 	}
 
 	return stopToLines
 }
 
-func generateMetroLineFiles(data *gtfs.Data, routes []gtfs.Route, routeToLine map[string]string, linesDir, nowStr string) error {
-	lineShapes := make(map[string][][2]float64)
-	lineColors := make(map[string]string)
+// lineFeatureCollection is the single-feature collection written for each
+// metro line and bus route. Fields are declared in alphabetical key order,
+// matching how encoding/json ordered the map-based features these replace,
+// so the generated files are unchanged.
+type lineFeatureCollection struct {
+	Features []lineFeature `json:"features"`
+	Type     string        `json:"type"`
+}
 
-	for _, route := range routes {
-		lineCode := routeToLine[route.RouteID]
-		if route.RouteColor != "" {
-			lineColors[lineCode] = "#" + route.RouteColor
-		}
+type lineFeature struct {
+	Geometry   lineGeometry `json:"geometry"`
+	Properties interface{}  `json:"properties"`
+	Type       string       `json:"type"`
+}
+
+type lineGeometry struct {
+	Coordinates [][2]float64 `json:"coordinates"`
+	Type        string       `json:"type"`
+}
+
+type metroLineProps struct {
+	Color          string `json:"color"`
+	LastVerifiedAt string `json:"last_verified_at"`
+	LineCode       string `json:"line_code"`
+}
+
+type busRouteProps struct {
+	Color          string `json:"color"`
+	LastVerifiedAt string `json:"last_verified_at"`
+	RouteCode      string `json:"route_code"`
+	RouteName      string `json:"route_name"`
+}
+
+func newLineFeatureCollection(coords [][2]float64, props interface{}) lineFeatureCollection {
+	return lineFeatureCollection{
+		Type: "FeatureCollection",
+		Features: []lineFeature{{
+			Type:       "Feature",
+			Geometry:   lineGeometry{Type: "LineString", Coordinates: coords},
+			Properties: props,
+		}},
 	}
+}
 
+// longestShapeByLine picks the shape with the most points among each line's
+// trips. Coordinates are built afterwards, only for the chosen shapes.
+func longestShapeByLine(data *gtfs.Data, routeToLine map[string]string) map[string][]gtfs.ShapePoint {
+	lineShapes := make(map[string][]gtfs.ShapePoint)
 	for _, trip := range data.Trips {
 		lineCode, ok := routeToLine[trip.RouteID]
 		if !ok || trip.ShapeID == "" {
@@ -206,16 +273,33 @@ func generateMetroLineFiles(data *gtfs.Data, routes []gtfs.Route, routeToLine ma
 			continue
 		}
 
-		coords := make([][2]float64, len(shapePoints))
-		for i, sp := range shapePoints {
-			coords[i] = [2]float64{sp.ShapePtLon, sp.ShapePtLat}
+		if existing, ok := lineShapes[lineCode]; !ok || len(shapePoints) > len(existing) {
+			lineShapes[lineCode] = shapePoints
 		}
+	}
+	return lineShapes
+}
+
+func shapeCoords(shapePoints []gtfs.ShapePoint) [][2]float64 {
+	coords := make([][2]float64, len(shapePoints))
+	for i, sp := range shapePoints {
+		coords[i] = [2]float64{sp.ShapePtLon, sp.ShapePtLat}
+	}
+	return coords
+}
 
-		if existing, ok := lineShapes[lineCode]; !ok || len(coords) > len(existing) {
-			lineShapes[lineCode] = coords
+func generateMetroLineFiles(data *gtfs.Data, routes []gtfs.Route, routeToLine map[string]string, linesDir, nowStr string) error {
+	lineColors := make(map[string]string)
+
+	for _, route := range routes {
+		lineCode := routeToLine[route.RouteID]
+		if route.RouteColor != "" {
+			lineColors[lineCode] = "#" + route.RouteColor
 		}
 	}
 
+	lineShapes := longestShapeByLine(data, routeToLine)
+
 	var sortedLines []string
 	for lineCode := range lineShapes {
 		sortedLines = append(sortedLines, lineCode)
@@ -223,10 +307,11 @@ func generateMetroLineFiles(data *gtfs.Data, routes []gtfs.Route, routeToLine ma
 	sort.Strings(sortedLines)
 
 	for _, lineCode := range sortedLines {
-		coords := lineShapes[lineCode]
-		if len(coords) < 2 {
+		shapePoints := lineShapes[lineCode]
+		if len(shapePoints) < 2 {
 			continue
 		}
+		coords := shapeCoords(shapePoints)
 
 		color := lineColors[lineCode]
 		if color == "" {
@@ -237,30 +322,13 @@ func generateMetroLineFiles(data *gtfs.Data, routes []gtfs.Route, routeToLine ma
 			}
 		}
 
-		feature := map[string]interface{}{
-			"type": "FeatureCollection",
-			"features": []map[string]interface{}{
-				{
-					"type": "Feature",
-					"geometry": map[string]interface{}{
-						"type":        "LineString",
-						"coordinates": coords,
-					},
-					"properties": map[string]interface{}{
-						"line_code":        lineCode,
-						"color":            color,
-						"last_verified_at": nowStr,
-					},
-				},
-			},
-		}
-
-		data, err := json.MarshalIndent(feature, "", "  ")
-		if err != nil {
-			return err
-		}
+		feature := newLineFeatureCollection(coords, metroLineProps{
+			Color:          color,
+			LastVerifiedAt: nowStr,
+			LineCode:       lineCode,
+		})
 
-		if err := os.WriteFile(filepath.Join(linesDir, lineCode+".geojson"), data, 0644); err != nil {
+		if err := writeJSONFile(filepath.Join(linesDir, lineCode+".geojson"), feature); err != nil {
 			return err
 		}
 	}
@@ -287,23 +355,23 @@ func generateMetroStations(stops []gtfs.Stop, stopToLines map[string]map[string]
 			continue
 		}
 
-		var lines []string
-		var colors []string
-		var primaryColor string
-
+		lines := make([]string, 0, len(linesMap))
 		for line := range linesMap {
 			lines = append(lines, line)
+		}
+		sort.Strings(lines)
+
+		// Derive colors from the sorted lines so they line up with "lines"
+		// and the primary color is stable between runs
+		var colors []string
+		for _, line := range lines {
 			if color, ok := MetroLineColorMap[line]; ok {
 				colors = append(colors, color)
-				if primaryColor == "" {
-					primaryColor = color
-				}
 			}
 		}
-		sort.Strings(lines)
-
-		if primaryColor == "" {
-			primaryColor = "#888888"
+		primaryColor := "#888888"
+		if len(colors) > 0 {
+			primaryColor = colors[0]
 		}
 
 		features = append(features, StationFeature{
@@ -332,12 +400,7 @@ func generateMetroStations(stops []gtfs.Stop, stopToLines map[string]map[string]
 		"features": features,
 	}
 
-	data, err := json.MarshalIndent(fc, "", "  ")
-	if err != nil {
-		return err
-	}
-
-	return os.WriteFile(filepath.Join(metroDir, "stations.geojson"), data, 0644)
+	return writeJSONFile(filepath.Join(metroDir, "stations.geojson"), fc)
 }
 
 func generateFunicularStations(stops []gtfs.Stop, stopToLines map[string]map[string]bool, metroDir string) error {
@@ -385,16 +448,10 @@ func generateFunicularStations(stops []gtfs.Stop, stopToLines map[string]map[str
 		"features": features,
 	}
 
-	data, err := json.MarshalIndent(fc, "", "  ")
-	if err != nil {
-		return err
-	}
-
-	return os.WriteFile(filepath.Join(metroDir, "funicular_stations.geojson"), data, 0644)
+	return writeJSONFile(filepath.Join(metroDir, "funicular_stations.geojson"), fc)
 }
 
 func generateBusRouteFiles(data *gtfs.Data, routes []gtfs.Route, routeToLine map[string]string, routesDir, nowStr string) error {
-	lineShapes := make(map[string][][2]float64)
 	lineColors := make(map[string]string)
 	lineNames := make(map[string]string)
 
@@ -408,69 +465,55 @@ func generateBusRouteFiles(data *gtfs.Data, routes []gtfs.Route, routeToLine map
 		}
 	}
 
-	for _, trip := range data.Trips {
-		lineCode, ok := routeToLine[trip.RouteID]
-		if !ok || trip.ShapeID == "" {
-			continue
-		}
+	lineShapes := longestShapeByLine(data, routeToLine)
 
-		shapePoints, ok := data.Shapes[trip.ShapeID]
-		if !ok {
-			continue
-		}
-
-		coords := make([][2]float64, len(shapePoints))
-		for i, sp := range shapePoints {
-			coords[i] = [2]float64{sp.ShapePtLon, sp.ShapePtLat}
-		}
+	// There are hundreds of bus routes and each file is independent, so
+	// encode and write them with a small pool of workers
+	lineCodes := make(chan string)
+	var wg sync.WaitGroup
+	var errMu sync.Mutex
+	var firstErr error
+	for w := 0; w < runtime.NumCPU(); w++ {
+		wg.Add(1)
+		go func() {
+			defer wg.Done()
+			for lineCode := range lineCodes {
+				color := lineColors[lineCode]
+				if color == "" {
+					color = "#DC143C" // Default bus color
+				}
 
-		if existing, ok := lineShapes[lineCode]; !ok || len(coords) > len(existing) {
-			lineShapes[lineCode] = coords
-		}
+				feature := newLineFeatureCollection(shapeCoords(lineShapes[lineCode]), busRouteProps{
+					Color:          color,
+					LastVerifiedAt: nowStr,
+					RouteCode:      lineCode,
+					RouteName:      lineNames[lineCode],
+				})
+
+				// Sanitize filename
+				fileName := strings.ReplaceAll(lineCode, "/", "_") + ".geojson"
+				if err := writeJSONFile(filepath.Join(routesDir, fileName), feature); err != nil {
+					// Keep writing the remaining routes and report the first failure
+					errMu.Lock()
+					if firstErr == nil {
+						firstErr = fmt.Errorf("failed to write %s: %w", fileName, err)
+					}
+					errMu.Unlock()
+				}
+			}
+		}()
 	}
 
-	for lineCode, coords := range lineShapes {
-		if len(coords) < 2 {
-			continue
-		}
-
-		color := lineColors[lineCode]
-		if color == "" {
-			color = "#DC143C" // Default bus color
-		}
-
-		feature := map[string]interface{}{
-			"type": "FeatureCollection",
-			"features": []map[string]interface{}{
-				{
-					"type": "Feature",
-					"geometry": map[string]interface{}{
-						"type":        "LineString",
-						"coordinates": coords,
-					},
-					"properties": map[string]interface{}{
-						"route_code":       lineCode,
-						"route_name":       lineNames[lineCode],
-						"color":            color,
-						"last_verified_at": nowStr,
-					},
-				},
-			},
-		}
-
-		data, err := json.MarshalIndent(feature, "", "  ")
-		if err != nil {
-			continue
-		}
-
-		// Sanitize filename
-		fileName := strings.ReplaceAll(lineCode, "/", "_") + ".geojson"
-		if err := os.WriteFile(filepath.Join(routesDir, fileName), data, 0644); err != nil {
+	for lineCode, shapePoints := range lineShapes {
+		if len(shapePoints) < 2 {
 			continue
 		}
+		lineCodes <- lineCode
 	}
+	close(lineCodes)
+	wg.Wait()
 
-	return nil
+	return firstErr
 }
 
 func generateBusStops(stops []gtfs.Stop, stopToLines map[string]map[string]bool, busDir string) error {
@@ -518,12 +561,7 @@ func generateBusStops(stops []gtfs.Stop, stopToLines map[string]map[string]bool,
 		"features": features,
 	}
 
-	data, err := json.MarshalIndent(fc, "", "  ")
-	if err != nil {
-		return err
-	}
-
-	return os.WriteFile(filepath.Join(busDir, "stops.geojson"), data, 0644)
+	return writeJSONFile(filepath.Join(busDir, "stops.geojson"), fc)
 }
 
 // manifestFileEntry matches the frontend's TmbManifestFile interface
@@ -627,12 +665,21 @@ func generateTMBManifest(outputDir, nowStr string) error {
 		"files":        files,
 	}
 
-	data, err := json.MarshalIndent(manifest, "", "  ")
+	return writeJSONFile(filepath.Join(outputDir, "manifest.json"), manifest)
+}
+
+// writeJSONFile writes v as indented JSON, removing the file again if the
+// write fails so no truncated output is left behind
+func writeJSONFile(path string, v interface{}) error {
+	data, err := json.MarshalIndent(v, "", "  ")
 	if err != nil {
 		return err
 	}
-
-	return os.WriteFile(filepath.Join(outputDir, "manifest.json"), data, 0644)
+	if err := os.WriteFile(path, data, 0644); err != nil {
+		os.Remove(path)
+		return err
+	}
+	return nil
 }
 
 func sha256Sum(data []byte) string {
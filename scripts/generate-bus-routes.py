@@ -10,16 +10,118 @@ This script:
 """
 
 import csv
+import hashlib
 import json
 import os
 import sys
 from collections import defaultdict
+from operator import itemgetter
 from pathlib import Path
 
-def read_csv(filepath):
-    """Read a CSV file and return list of dicts"""
-    with open(filepath, 'r', encoding='utf-8-sig') as f:
-        return list(csv.DictReader(f))
+try:
+    import orjson
+except ImportError:  # optional speedup; the stdlib encoder is the fallback
+    orjson = None
+
+try:
+    import pandas as pd
+except ImportError:  # optional speedup; read_rows is the fallback
+    pd = None
+
+# Bump when the generated output changes so an unchanged feed is regenerated
+GENERATOR_VERSION = "1"
+SOURCE_FILES = ['routes.txt', 'trips.txt', 'shapes.txt']
+
+SHAPE_COLUMNS = ['shape_id', 'shape_pt_lat', 'shape_pt_lon', 'shape_pt_sequence']
+
+def write_json(filepath, obj):
+    """Write obj to filepath as UTF-8 JSON indented by 2 spaces"""
+    if orjson is not None:
+        Path(filepath).write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+        return
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, indent=2, ensure_ascii=False)
+
+def read_rows(filepath, columns, defaults=None):
+    """Yield a tuple of the requested columns for each row of a CSV file.
+
+    Columns missing from the header yield their value from defaults (or '').
+    """
+    defaults = defaults or {}
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        header = [h.lstrip('\ufeff').strip() for h in header]
+        idx = [header.index(c) if c in header else None for c in columns]
+        fallback = [defaults.get(c, '') for c in columns]
+        for row in reader:
+            n = len(row)
+            yield tuple(
+                row[i] if i is not None and i < n else d
+                for i, d in zip(idx, fallback)
+            )
+
+def read_shape_points(filepath, shape_ids):
+    """Return {shape_id: [(lon, lat), ...]} in sequence order for shape_ids"""
+    if pd is not None:
+        df = pd.read_csv(
+            filepath,
+            usecols=SHAPE_COLUMNS,
+            dtype={'shape_id': str},
+            float_precision='round_trip',  # parse floats exactly like float()
+            encoding='utf-8-sig',
+            keep_default_na=False,  # keep shape_ids such as 'NA' or 'null'
+        )
+        df = df[df['shape_id'].isin(shape_ids)].copy()
+        for col in ('shape_pt_lat', 'shape_pt_lon', 'shape_pt_sequence'):
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        df = df.dropna().sort_values(['shape_id', 'shape_pt_sequence'], kind='stable')
+        return {
+            shape_id: list(zip(g['shape_pt_lon'].tolist(), g['shape_pt_lat'].tolist()))
+            for shape_id, g in df.groupby('shape_id', sort=False)
+        }
+
+    points = defaultdict(list)
+    for shape_id, lat, lon, seq in read_rows(filepath, SHAPE_COLUMNS):
+        if shape_id not in shape_ids:
+            continue
+        try:
+            point = (int(seq), float(lon), float(lat))
+        except ValueError:
+            continue
+        points[shape_id].append(point)
+
+    return {
+        shape_id: [(lon, lat) for _, lon, lat in sorted(pts, key=itemgetter(0))]
+        for shape_id, pts in points.items()
+    }
+
+def source_fingerprint(gtfs_dir):
+    """SHA-256 over the generator version and the GTFS files this script reads"""
+    h = hashlib.sha256(GENERATOR_VERSION.encode())
+    for name in SOURCE_FILES:
+        h.update(name.encode())
+        with open(gtfs_dir / name, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+    return h.hexdigest()
+
+def load_manifest(manifest_path):
+    if manifest_path.exists():
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {'files': []}
+
+def is_up_to_date(manifest, output_dir, src_hash):
+    """True if the manifest was built from src_hash and its bus route files exist"""
+    if manifest.get('bus_routes_source_sha256') != src_hash:
+        return False
+    entries = [f for f in manifest.get('files', []) if f.get('type') == 'bus_route']
+    return bool(entries) and all(
+        (output_dir / f"{f.get('route_code')}.geojson").exists() for f in entries
+    )
 
 def main():
     if len(sys.argv) < 3:
@@ -33,54 +135,48 @@ def main():
     print(f"Reading GTFS from: {gtfs_dir}")
     print(f"Output directory: {output_dir}")
 
+    manifest_path = output_dir.parent / 'manifest.json'
+    manifest = load_manifest(manifest_path)
+    src_hash = source_fingerprint(gtfs_dir)
+    if is_up_to_date(manifest, output_dir, src_hash):
+        print(f"Bus routes up to date (source {src_hash[:12]}...), nothing to do")
+        return
+
     # 1. Read routes.txt - get bus routes (route_type=3)
-    routes_data = read_csv(gtfs_dir / 'routes.txt')
     bus_routes = {}
-    for route in routes_data:
-        if route.get('route_type') == '3':  # Bus
-            route_id = route['route_id']
+    route_rows = read_rows(
+        gtfs_dir / 'routes.txt',
+        ['route_id', 'route_type', 'route_short_name', 'route_long_name',
+         'route_color', 'route_text_color'],
+        defaults={'route_color': 'FF0000', 'route_text_color': 'FFFFFF'},
+    )
+    for route_id, route_type, short_name, long_name, color, text_color in route_rows:
+        if route_type == '3':  # Bus
             bus_routes[route_id] = {
                 'route_id': route_id,
-                'route_short_name': route.get('route_short_name', ''),
-                'route_long_name': route.get('route_long_name', ''),
-                'route_color': route.get('route_color', 'FF0000'),
-                'route_text_color': route.get('route_text_color', 'FFFFFF'),
+                'route_short_name': short_name,
+                'route_long_name': long_name,
+                'route_color': color,
+                'route_text_color': text_color,
             }
     print(f"Found {len(bus_routes)} bus routes")
 
     # 2. Read trips.txt - get shape_id for each route
-    trips_data = read_csv(gtfs_dir / 'trips.txt')
     route_shapes = defaultdict(set)
-    for trip in trips_data:
-        route_id = trip.get('route_id')
-        shape_id = trip.get('shape_id')
+    needed_shapes = set()
+    for route_id, shape_id in read_rows(gtfs_dir / 'trips.txt', ['route_id', 'shape_id']):
         if route_id in bus_routes and shape_id:
             route_shapes[route_id].add(shape_id)
+            needed_shapes.add(shape_id)
 
     print(f"Found shapes for {len(route_shapes)} routes")
 
-    # 3. Read shapes.txt - build coordinate arrays
+    # 3. Read shapes.txt - build coordinate arrays for the shapes used by bus routes
     print("Reading shapes.txt...")
-    shapes_data = read_csv(gtfs_dir / 'shapes.txt')
-
-    # Group by shape_id
-    shape_points = defaultdict(list)
-    for point in shapes_data:
-        shape_id = point['shape_id']
-        try:
-            lat = float(point['shape_pt_lat'])
-            lon = float(point['shape_pt_lon'])
-            seq = int(point['shape_pt_sequence'])
-            shape_points[shape_id].append((seq, lon, lat))
-        except (ValueError, KeyError) as e:
-            continue
+    shape_points = read_shape_points(gtfs_dir / 'shapes.txt', needed_shapes)
 
     print(f"Loaded {len(shape_points)} shapes")
 
-    # Sort points by sequence
-    for shape_id in shape_points:
-        shape_points[shape_id].sort(key=lambda x: x[0])
-
     # 4. Generate GeoJSON for each bus route
     generated = 0
     for route_id, route_info in bus_routes.items():
@@ -91,7 +187,7 @@ def main():
         all_coords = []
         for shape_id in route_shapes[route_id]:
             if shape_id in shape_points:
-                coords = [[pt[1], pt[2]] for pt in shape_points[shape_id]]
+                coords = [[lon, lat] for lon, lat in shape_points[shape_id]]
                 if coords:
                     all_coords.extend(coords)
                     break  # Use first shape found
@@ -124,8 +220,7 @@ def main():
             continue
 
         output_file = output_dir / f"{short_name}.geojson"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(geojson, f, indent=2)
+        write_json(output_file, geojson)
 
         generated += 1
 
@@ -133,13 +228,6 @@ def main():
 
     # 5. Update manifest
     print("\nUpdating manifest...")
-    manifest_path = output_dir.parent / 'manifest.json'
-    if manifest_path.exists():
-        with open(manifest_path, 'r') as f:
-            manifest = json.load(f)
-    else:
-        manifest = {'files': []}
-
     # Remove old bus_route entries
     manifest['files'] = [f for f in manifest['files'] if f.get('type') != 'bus_route']
 
@@ -161,9 +249,9 @@ def main():
 
     # Sort by route_code
     manifest['files'].sort(key=lambda x: (x.get('type', ''), x.get('route_code', '')))
+    manifest['bus_routes_source_sha256'] = src_hash
 
-    with open(manifest_path, 'w') as f:
-        json.dump(manifest, f, indent=2)
+    write_json(manifest_path, manifest)
 
     print(f"Updated manifest with {len([f for f in manifest['files'] if f.get('type') == 'bus_route'])} bus routes")
     print("Done!")